@@ -13,12 +13,47 @@ import sys
 from pathlib import Path
 
 # Import subcommand modules
-from commands import strings_export, strings_import, html_export, html_import
+from commands import (
+    strings_diff, strings_export, strings_import, strings_snapshot, strings_stats,
+    html_export, html_import, serve,
+)
+from commands.utils import reporting
+from commands.utils.interchange import FORMATS
+from commands.utils.memory import MemoryTracker
 
 
-def create_parser():
-    """Create the main argument parser with subcommands."""
-    parser = argparse.ArgumentParser(
+def create_common_parser():
+    """Create the parent parser holding the options shared by every command."""
+    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Suppress per-module, per-language and per-file output (summaries, warnings and errors are still shown)'
+    )
+    common_parser.add_argument(
+        '--metrics-json',
+        type=Path,
+        metavar='FILE',
+        help='Write run metrics (counters, per-phase durations, items per second) to this JSON file'
+    )
+    common_parser.add_argument(
+        '--memory-report',
+        type=Path,
+        metavar='FILE',
+        help='Track peak and retained memory per module and phase (tracemalloc + RSS) and write a JSON report'
+    )
+    return common_parser
+
+
+def create_parser(parser_class=argparse.ArgumentParser):
+    """
+    Create the main argument parser with subcommands.
+    
+    Args:
+        parser_class: ArgumentParser subclass of the parser and its subcommand parsers
+    """
+    common_parser = create_common_parser()
+    parser = parser_class(
         prog='android-translator',
         description='Manage translations for Android projects (strings.xml and HTML files)',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -33,6 +68,13 @@ Examples:
   # Import strings from Excel back to Android project
   %(prog)s strings import /path/to/android/project
   
+  # Show translation coverage per module and locale
+  %(prog)s strings stats /path/to/android/project
+  
+  # Snapshot a release, then list the keys changed since the previous one
+  %(prog)s strings snapshot /path/to/android/project --output v2.snapshot
+  %(prog)s strings diff v1.snapshot v2.snapshot
+  
   # Export HTML translations
   %(prog)s html export /path/to/project/module/src/main/assets/html
   
@@ -51,6 +93,13 @@ For more information, see README.md
         action='version',
         version='%(prog)s 2.0.0'
     )
+    parser.add_argument(
+        '--server',
+        type=Path,
+        metavar='SOCKET',
+        help='Forward the command to a server started with "serve --socket SOCKET" '
+             '(runs locally if the server cannot be reached)'
+    )
     
     subparsers = parser.add_subparsers(
         title='commands',
@@ -74,6 +123,7 @@ For more information, see README.md
     # Strings export
     strings_export_parser = strings_subparsers.add_parser(
         'export',
+        parents=[common_parser],
         help='Export strings.xml files to Excel',
         description='Export all strings.xml files from Android modules to Excel files (one per module)'
     )
@@ -93,11 +143,85 @@ For more information, see README.md
         default='en',
         help='Default language code (default: en)'
     )
+    strings_export_parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Overlap module discovery, file reading, parsing and workbook writing'
+    )
+    strings_export_parser.add_argument(
+        '--readers',
+        type=int,
+        default=2,
+        help='Number of reader threads in --pipeline mode (default: 2)'
+    )
+    strings_export_parser.add_argument(
+        '--parsers',
+        type=int,
+        default=2,
+        help='Number of parser threads in --pipeline mode (default: 2)'
+    )
+    strings_export_parser.add_argument(
+        '--writers',
+        type=int,
+        default=2,
+        help='Number of workbook writer threads in --pipeline mode (default: 2)'
+    )
+    strings_export_parser.add_argument(
+        '--shard-size',
+        type=int,
+        metavar='N',
+        help='Split modules with more than N keys into several files by key range, with a shards index'
+    )
+    strings_export_parser.add_argument(
+        '--since',
+        metavar='GIT_REF',
+        help='Only export modules whose res/values*/strings.xml files changed since this git ref '
+             '(including uncommitted and untracked files)'
+    )
+    strings_export_parser.add_argument(
+        '--prefill',
+        metavar='PROVIDER',
+        help="Pre-fill empty translations by machine translation before review: 'pseudo' "
+             "(deterministic, offline) or a 'package.module:ClassName' provider"
+    )
+    strings_export_parser.add_argument(
+        '--prefill-cache',
+        type=Path,
+        metavar='FILE',
+        help='SQLite translation cache used by --prefill (default: output-dir/translation-cache.sqlite)'
+    )
+    strings_export_parser.add_argument(
+        '--prefill-batch-size',
+        type=int,
+        default=50,
+        metavar='N',
+        help='Number of texts sent to the provider per request (default: 50)'
+    )
+    strings_export_parser.add_argument(
+        '--prefill-concurrency',
+        type=int,
+        default=4,
+        metavar='N',
+        help='Maximum number of provider requests in flight (default: 4)'
+    )
+    strings_export_parser.add_argument(
+        '--no-fingerprints',
+        action='store_true',
+        help='Do not add the hidden _fingerprint column that lets import apply only the cells '
+             'translators changed and detect sources edited since export'
+    )
+    strings_export_parser.add_argument(
+        '--format',
+        choices=FORMATS,
+        default='xlsx',
+        help='Output format (default: xlsx). csv, tsv and jsonl are written without pandas/openpyxl'
+    )
     strings_export_parser.set_defaults(func=strings_export.execute)
     
     # Strings import
     strings_import_parser = strings_subparsers.add_parser(
         'import',
+        parents=[common_parser],
         help='Import Excel files to strings.xml files',
         description='Import translations from Excel files back to Android strings.xml files (one per module)'
     )
@@ -117,8 +241,134 @@ For more information, see README.md
         default='en',
         help='Default language code (default: en)'
     )
+    strings_import_parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='Report added, changed, removed and unchanged keys without writing any file'
+    )
+    strings_import_parser.add_argument(
+        '--validate',
+        action='store_true',
+        help='Check placeholders, HTML tags and reserved characters against the default language'
+    )
+    strings_import_parser.add_argument(
+        '--validation-report',
+        type=Path,
+        help='Write validation issues to this JSON file (implies --validate)'
+    )
+    strings_import_parser.add_argument(
+        '--fail-on-error',
+        action='store_true',
+        help='Do not write strings.xml files with validation errors and exit with an error (implies --validate)'
+    )
+    strings_import_parser.add_argument(
+        '--discover',
+        action='store_true',
+        help='Discover modules by walking the project instead of using the manifest written by export'
+    )
+    strings_import_parser.add_argument(
+        '--fsync',
+        action='store_true',
+        help="Flush each module's files to disk before publishing them (slower, survives power loss)"
+    )
+    strings_import_parser.add_argument(
+        '--format',
+        choices=FORMATS,
+        default='xlsx',
+        help='Format of the files to import (default: xlsx). csv, tsv and jsonl are read without pandas/openpyxl'
+    )
     strings_import_parser.set_defaults(func=strings_import.execute)
     
+    # Strings stats
+    strings_stats_parser = strings_subparsers.add_parser(
+        'stats',
+        parents=[common_parser],
+        help='Report translation coverage per module and locale',
+        description='Count total, translated, missing, stale and non-translatable keys per module and '
+                    'locale straight from the strings.xml files (no Excel file is written)'
+    )
+    strings_stats_parser.add_argument(
+        'android_root',
+        type=Path,
+        help='Path to Android project root (will auto-discover all modules)'
+    )
+    strings_stats_parser.add_argument(
+        '--default-language',
+        default='en',
+        help='Default language code (default: en)'
+    )
+    strings_stats_parser.add_argument(
+        '--format',
+        choices=['table', 'json'],
+        default='table',
+        help='Report format (default: table)'
+    )
+    strings_stats_parser.add_argument(
+        '--output',
+        type=Path,
+        metavar='FILE',
+        help='Write the report to this file instead of the console'
+    )
+    strings_stats_parser.set_defaults(func=strings_stats.execute)
+    
+    # Strings snapshot
+    strings_snapshot_parser = strings_subparsers.add_parser(
+        'snapshot',
+        parents=[common_parser],
+        help='Save every module and locale to a compact snapshot file',
+        description='Save the strings of every module and locale to a compact binary snapshot, '
+                    'to compare releases with "strings diff"'
+    )
+    strings_snapshot_parser.add_argument(
+        'android_root',
+        type=Path,
+        help='Path to Android project root (will auto-discover all modules)'
+    )
+    strings_snapshot_parser.add_argument(
+        '--default-language',
+        default='en',
+        help='Default language code (default: en)'
+    )
+    strings_snapshot_parser.add_argument(
+        '--output',
+        type=Path,
+        metavar='FILE',
+        help='Snapshot file to write (default: out/project/strings.snapshot)'
+    )
+    strings_snapshot_parser.set_defaults(func=strings_snapshot.execute)
+    
+    # Strings diff
+    strings_diff_parser = strings_subparsers.add_parser(
+        'diff',
+        parents=[common_parser],
+        help='List the keys added, removed and changed between two snapshots',
+        description='Compare two snapshots written by "strings snapshot" and list the keys added, '
+                    'removed and changed per module and locale'
+    )
+    strings_diff_parser.add_argument(
+        'old',
+        type=Path,
+        help='Snapshot of the earlier release'
+    )
+    strings_diff_parser.add_argument(
+        'new',
+        type=Path,
+        help='Snapshot of the later release'
+    )
+    strings_diff_parser.add_argument(
+        '--format',
+        choices=['text', 'json'],
+        default='text',
+        help='Report format (default: text). json also gives the old and new values'
+    )
+    strings_diff_parser.add_argument(
+        '--output',
+        type=Path,
+        metavar='FILE',
+        help='Write the report to this file instead of the console'
+    )
+    strings_diff_parser.set_defaults(func=strings_diff.execute)
+    
     # HTML subcommand group
     html_parser = subparsers.add_parser(
         'html',
@@ -134,6 +384,7 @@ For more information, see README.md
     # HTML export
     html_export_parser = html_subparsers.add_parser(
         'export',
+        parents=[common_parser],
         help='Export HTML files to Excel',
         description='Export HTML files from language directories to Excel files (one per language)'
     )
@@ -148,16 +399,30 @@ For more information, see README.md
         default=Path('out'),
         help='Output directory for Excel files (default: out). Files organized as output-dir/project/html/'
     )
-    html_export_parser.add_argument(
+    html_export_content = html_export_parser.add_mutually_exclusive_group()
+    html_export_content.add_argument(
         '--remove-html-tags',
         action='store_true',
         help='Remove HTML tags in exported content (default: keep tags)'
     )
+    html_export_content.add_argument(
+        '--segments',
+        action='store_true',
+        help='Export translatable text segments (deduplicated across pages) instead of whole files, '
+             'with a skeleton used by "html import --segments" to rebuild the markup'
+    )
+    html_export_parser.add_argument(
+        '--format',
+        choices=FORMATS,
+        default='xlsx',
+        help='Output format (default: xlsx). csv, tsv and jsonl are written without pandas/openpyxl'
+    )
     html_export_parser.set_defaults(func=html_export.execute)
     
     # HTML import
     html_import_parser = html_subparsers.add_parser(
         'import',
+        parents=[common_parser],
         help='Import Excel files to HTML',
         description='Import translations from Excel files back to HTML files'
     )
@@ -172,24 +437,101 @@ For more information, see README.md
         default=Path('out'),
         help='Directory containing exported Excel files (default: out). Expected structure: output-dir/project/html/'
     )
-    html_import_parser.add_argument(
+    html_import_content = html_import_parser.add_mutually_exclusive_group()
+    html_import_content.add_argument(
         '--plain-text-to-html',
         action='store_true',
         help='Wrap each plain-text line in a <p> tag when generating HTML files'
     )
+    html_import_content.add_argument(
+        '--segments',
+        action='store_true',
+        help='Rebuild the HTML files from the skeletons and translated segments of an '
+             '"html export --segments"'
+    )
+    html_import_parser.add_argument(
+        '--fsync',
+        action='store_true',
+        help="Flush each language's files to disk before publishing them (slower, survives power loss)"
+    )
+    html_import_parser.add_argument(
+        '--format',
+        choices=FORMATS,
+        default='xlsx',
+        help='Format of the files to import (default: xlsx). csv, tsv and jsonl are read without pandas/openpyxl'
+    )
     html_import_parser.set_defaults(func=html_import.execute)
     
+    # Server
+    serve_parser = subparsers.add_parser(
+        'serve',
+        parents=[common_parser],
+        help='Serve commands from a long-lived process',
+        description='Keep libraries, module discovery and parsed strings.xml files warm and run the '
+                    'commands forwarded with --server SOCKET (JSON Lines over a Unix socket)'
+    )
+    serve_parser.add_argument(
+        '--socket',
+        type=Path,
+        required=True,
+        help='Path of the Unix socket to listen on'
+    )
+    serve_parser.add_argument(
+        '--discovery-ttl',
+        type=float,
+        default=60.0,
+        metavar='SECONDS',
+        help='How long module discovery results are reused before walking the project again (default: 60)'
+    )
+    serve_parser.set_defaults(func=serve.execute)
+    
     return parser
 
 
+def run_command(args, stream=None):
+    """
+    Run the command selected by parsed arguments.
+    
+    The run reports to its own report (output stream, --quiet, --metrics-json)
+    and optional memory tracking (--memory-report).
+    
+    Args:
+        args: Parsed arguments
+        stream: Text stream receiving the output (default: sys.stdout)
+    """
+    command = " ".join(filter(None, [args.command, getattr(args, f'{args.command}_command', None)]))
+    memory = MemoryTracker() if args.memory_report else None
+    with reporting.run(command, quiet=args.quiet, stream=stream, memory=memory) as report:
+        if memory:
+            memory.start()
+        try:
+            args.func(args)
+        finally:
+            if memory:
+                memory.stop()
+                memory.write_json(args.memory_report)
+            if args.metrics_json:
+                report.write_json(args.metrics_json)
+
+
 def main():
     """Main entry point for the CLI."""
     parser = create_parser()
     args = parser.parse_args()
     
+    # Thin client mode: the server runs the command and streams its output back
+    if args.server and args.command != 'serve':
+        try:
+            sys.exit(serve.forward(args.server, serve.strip_option(sys.argv[1:], '--server')))
+        except OSError as e:
+            print(f"⚠️  Server not reachable at {args.server} ({e}), running locally", file=sys.stderr)
+        except RuntimeError as e:
+            print(f"\n❌ Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    
     try:
         # Execute the appropriate subcommand
-        args.func(args)
+        run_command(args)
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user.", file=sys.stderr)
         sys.exit(130)
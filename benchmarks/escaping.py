@@ -0,0 +1,31 @@
+"""
+Micro-benchmark of the Android string escaping codec over a million typical cells.
+
+Run from the repository root: python benchmarks/escaping.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from commands.utils.escaping import escape_android_string, unescape_android_string  # noqa: E402
+
+
+def main():
+    cells = [f"Hello %{i % 3 + 1}$s, it's item {i}" if i % 10 else f"Line {i}\nnext \"quoted\""
+             for i in range(1000000)]
+
+    start = time.perf_counter()
+    escaped_cells = [escape_android_string(cell) for cell in cells]
+    middle = time.perf_counter()
+    for cell in escaped_cells:
+        unescape_android_string(cell)
+    stop = time.perf_counter()
+
+    print(f"escape:   {middle - start:.2f}s per million cells")
+    print(f"unescape: {stop - middle:.2f}s per million cells")
+
+
+if __name__ == '__main__':
+    main()
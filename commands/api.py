@@ -0,0 +1,254 @@
+"""
+In-process library API for build tools and long-lived hosts.
+
+Tables are the lists of rows the commands exchange through files, kept in
+memory: a header first, then one row per key (strings) or per file (HTML).
+Nothing is written to Excel or CSV unless write_table() is called.
+
+    from commands.api import Session
+
+    session = Session("~/projects/MyApp")
+    tables = session.export_strings()            # {module name: rows}
+    tables["app"][1][2] = "Bonjour"
+    session.import_strings(tables, validate=True)
+
+A Session caches module discovery and the parsed table of every module
+(invalidated when a strings.xml changes on disk), so repeated calls only
+re-read what changed. Sessions are reentrant: each call reports to its
+own run, so calls from several threads do not mix their output or metrics.
+"""
+import threading
+from pathlib import Path
+
+from commands.html_export import read_html_language
+from commands.html_import import check_page_table, file_entries, write_html_rows
+from commands.strings_export import build_module_table, read_module_sources, write_table_file
+from commands.strings_import import (
+    apply_translations, plan_translations, read_xlsx_rows, translations_from_rows,
+)
+from commands.utils import reporting
+from commands.utils.interchange import TEXT_FORMATS, read_rows
+from commands.utils.resources import index_string_folders
+from commands.utils.util import discover_android_modules
+
+
+class Session:
+    """Strings export and import of one Android project, with discovery and parse caches."""
+
+    def __init__(self, android_root, default_language='en', quiet=True, stream=None):
+        """
+        Args:
+            android_root: Path to the Android project root
+            default_language: Language code of the unqualified values folder
+            quiet: Silence per-module and per-language progress messages
+            stream: Text stream receiving the output (default: sys.stdout)
+        """
+        self.android_root = Path(android_root).expanduser()
+        self.default_language = default_language
+        self.quiet = quiet
+        self.stream = stream
+        self._modules = None
+        self._tables = {}
+        self._lock = threading.Lock()
+
+        if not self.android_root.exists():
+            raise FileNotFoundError(f"Android root path does not exist: {self.android_root}")
+
+    def _run(self, command):
+        return reporting.run(command, quiet=self.quiet, stream=self.stream)
+
+    def modules(self, refresh=False):
+        """
+        Return the (module name, module path) pairs of the project.
+
+        Args:
+            refresh: Discover the modules again instead of using the cache
+        """
+        with self._lock:
+            modules = None if refresh else self._modules
+        if modules is None:
+            modules = discover_android_modules(self.android_root)
+            with self._lock:
+                self._modules = modules
+        return list(modules)
+
+    def _select(self, names):
+        modules = self.modules()
+        if names is None:
+            return modules
+        names = set(names)
+        unknown = names.difference(name for name, _ in modules)
+        if unknown:
+            raise ValueError(f"Unknown module(s): {', '.join(sorted(unknown))}")
+        return [module for module in modules if module[0] in names]
+
+    def _module_table(self, module_name, module_path):
+        """Return a copy of the table of a module, parsing its files only if they changed."""
+        res_path = module_path / "res"
+        files = index_string_folders(res_path, self.default_language)
+        signature = tuple(
+            (lang, str(path), stat.st_mtime_ns, stat.st_size)
+            for lang, path in files.items()
+            for stat in (path.stat(),)
+        )
+
+        with self._lock:
+            cached = self._tables.get(module_name)
+        if cached is not None and cached[0] == signature:
+            reporting.count('cache_hits')
+            data = cached[1]
+        else:
+            sources = read_module_sources(module_name, module_path, self.default_language)
+            table = None if sources is None else build_module_table(module_name, sources)
+            data = None if table is None else table[0]
+            with self._lock:
+                self._tables[module_name] = (signature, data)
+
+        # Callers may edit their tables, the cached one is never handed out
+        return None if data is None else [list(row) for row in data]
+
+    def export_strings(self, modules=None, prefiller=None):
+        """
+        Build the translation tables of the project in memory.
+
+        Args:
+            modules: Names of the modules to export (None for all)
+            prefiller: commands.utils.prefill.Prefiller filling empty cells (optional)
+
+        Returns:
+            Dictionary of module name -> rows, header first (["key", lang...,
+            "_fingerprint"]); values are plain text. Modules without strings
+            are left out. import_strings() only applies the cells that differ
+            from the row fingerprint.
+        """
+        tables = {}
+        with self._run('api strings export'):
+            for module_name, module_path in self._select(modules):
+                data = self._module_table(module_name, module_path)
+                if data is None:
+                    continue
+                if prefiller is not None:
+                    prefiller.fill(module_name, data)
+                tables[module_name] = data
+                reporting.count('modules')
+        return tables
+
+    def plan_strings(self, tables):
+        """
+        Compare tables with the strings.xml files without writing anything.
+
+        Args:
+            tables: Dictionary of module name -> rows, as returned by export_strings()
+
+        Returns:
+            Dictionary of module name -> {language: {'added', 'changed', 'removed', 'unchanged'}}
+        """
+        plans = {}
+        with self._run('api strings plan'):
+            modules = dict(self._select(tables))
+            for module_name, rows in tables.items():
+                plans[module_name] = plan_translations(
+                    module_name, modules[module_name], translations_from_rows(rows, plain_text=True),
+                    self.default_language,
+                )
+        return plans
+
+    def import_strings(self, tables, validate=False, fail_on_error=False):
+        """
+        Write tables to the strings.xml files of their modules.
+
+        Args:
+            tables: Dictionary of module name -> rows, as returned by export_strings()
+            validate: Check placeholders, markup and reserved characters
+            fail_on_error: Do not write languages for which validation finds an error
+
+        Returns:
+            Tuple (written, issues): the list of strings.xml paths written and
+            the list of validation issues (empty unless validating)
+        """
+        written = []
+        issues = [] if validate or fail_on_error else None
+        with self._run('api strings import'):
+            modules = dict(self._select(tables))
+            for module_name, rows in tables.items():
+                written.extend(apply_translations(
+                    module_name, modules[module_name], translations_from_rows(rows, plain_text=True),
+                    self.default_language, issues, fail_on_error,
+                ))
+                reporting.count('modules')
+        return written, issues or []
+
+    def clear(self):
+        """Drop the discovery and parse caches."""
+        with self._lock:
+            self._modules = None
+            self._tables.clear()
+
+
+def export_html(html_path, remove_html_tags=False, quiet=True, stream=None):
+    """
+    Read the HTML files of every language directory of html_path into tables.
+
+    Returns:
+        Dictionary of language -> rows, header first (["file", "content"], plus
+        "part" and "checksum" when a file too large for a cell was split)
+    """
+    html_path = Path(html_path).expanduser()
+    if not html_path.is_dir():
+        raise NotADirectoryError(f"HTML path is not a directory: {html_path}")
+
+    tables = {}
+    with reporting.run('api html export', quiet=quiet, stream=stream):
+        for lang_dir in sorted(item for item in html_path.iterdir() if item.is_dir()):
+            html_files = sorted(x for x in lang_dir.iterdir() if x.suffix == '.html')
+            if html_files:
+                tables[lang_dir.name] = read_html_language(lang_dir, html_files, remove_html_tags)
+    return tables
+
+
+def import_html(html_path, tables, plain_text_to_html=False, quiet=True, stream=None):
+    """
+    Write HTML tables to html_path/<language>/.
+
+    Args:
+        html_path: HTML directory (one sub-directory per language)
+        tables: Dictionary of language -> rows, as returned by export_html()
+        plain_text_to_html: Wrap each line of plain text in a <p> element
+
+    Returns:
+        List of the HTML file paths written
+    """
+    html_path = Path(html_path).expanduser()
+    written = []
+    with reporting.run('api html import', quiet=quiet, stream=stream):
+        for lang, rows in tables.items():
+            check_page_table(rows, f"Table '{lang}'")
+            written.extend(write_html_rows(
+                file_entries(rows), html_path / lang, plain_text_to_html, label=lang,
+            ))
+    return written
+
+
+def write_table(rows, filename, fmt=None):
+    """
+    Write a table to an Excel or plain-text interchange file.
+
+    Args:
+        rows: Rows, header first
+        filename: Output file path
+        fmt: 'xlsx', 'csv', 'tsv' or 'jsonl' (default: from the file suffix)
+
+    Returns:
+        Path of the file written
+    """
+    filename = Path(filename)
+    return write_table_file(rows, filename, fmt or filename.suffix.lstrip('.'))
+
+
+def read_table(filename):
+    """Read a table (rows, header first) from an Excel or plain-text interchange file."""
+    filename = Path(filename)
+    fmt = filename.suffix.lstrip('.')
+    if fmt in TEXT_FORMATS:
+        return read_rows(filename, fmt)
+    return [list(row) for row in read_xlsx_rows(filename)]
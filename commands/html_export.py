@@ -2,16 +2,193 @@
 Export HTML translations to Excel format.
 """
 import csv
+import json
 import re
 
+from commands.utils.chunks import content_checksum, format_part, split_content
+from commands.utils.interchange import write_rows
+from commands.utils.reporting import count, log, phase, progress
+from commands.utils.segments import segment_html
 from commands.utils.util import convert_to_excel
 
 
+def cell_rows(name, content, extra=()):
+    """
+    Return the table rows of a content: a single row if it fits in a
+    spreadsheet cell, else one row per part with its part label and the
+    checksum of the whole content.
+    
+    Args:
+        name: First cell of the rows (file name or segment id)
+        content: Content of the second cell
+        extra: Cells following the content
+    """
+    parts = split_content(content)
+    if len(parts) == 1:
+        return [[name, content, *extra]]
+    
+    checksum = content_checksum(content)
+    return [[name, part, *extra, format_part(index, len(parts)), checksum]
+            for index, part in enumerate(parts, start=1)]
+
+
+def add_part_columns(rows):
+    """Add the part and checksum columns to a table, left empty for the rows that were not split."""
+    width = len(rows[0]) + 2
+    rows[0] += ["part", "checksum"]
+    for row in rows[1:]:
+        row += [""] * (width - len(row))
+
+
+def read_html_language(lang_dir, html_files, remove_html_tags=False):
+    """
+    Read the HTML files of a language directory into table rows.
+    
+    Files too large for a spreadsheet cell are split into several rows, with
+    "part" and "checksum" columns added to the table.
+    
+    Args:
+        lang_dir: Language directory (its name labels the phases)
+        html_files: Sorted list of the HTML files to read
+        remove_html_tags: Strip markup and keep the text only
+        
+    Returns:
+        List of rows, header first: ["file", "content"] (plus "part" and
+        "checksum" if a file was split), then one row per file or file part
+    """
+    rows = [["file", "content"]]
+    chunked = False
+    
+    for html_file in html_files:
+        try:
+            with phase('read', lang_dir.name), open(html_file, 'r', encoding='utf-8') as file_handler:
+                lines = file_handler.readlines()
+                joined_lines = "".join(lines)
+                count('files_read')
+                count('bytes_read', html_file.stat().st_size)
+                
+                # Remove HTML tags (only with --remove-html-tags)
+                if remove_html_tags:
+                    joined_lines = re.sub('<[^<]+?>', '', joined_lines)
+                
+                # Trim leading and trailing whitespaces
+                joined_lines = joined_lines.strip()
+                
+                file_rows = cell_rows(html_file.name, joined_lines)
+                rows.extend(file_rows)
+                if len(file_rows) == 1:
+                    progress(f"    ✓ {html_file.name}")
+                else:
+                    chunked = True
+                    count('files_split')
+                    progress(f"    ✓ {html_file.name} ({len(file_rows)} parts)")
+                
+        except Exception as e:
+            log(f"    ⚠️  Skipped file {html_file.name}: {e}")
+    
+    if chunked:
+        add_part_columns(rows)
+    
+    return rows
+
+
+def read_html_segments(lang_dir, html_files, output_dir):
+    """
+    Segment the HTML files of a language directory and write their skeleton.
+    
+    Segments shared by several pages become a single row. The skeleton
+    (lang.skeleton.json in output_dir) holds everything around the segments
+    and is what html import --segments rebuilds the pages from.
+    
+    Args:
+        lang_dir: Language directory
+        html_files: Sorted list of the HTML files to read
+        output_dir: Directory receiving the skeleton file
+        
+    Returns:
+        List of rows, header first: ["id", "text", "files"], one row per unique
+        segment (plus "part" and "checksum" columns and one row per part if a
+        segment is too large for a spreadsheet cell)
+    """
+    skeleton = {'language': lang_dir.name, 'files': {}, 'segments': {}}
+    pages = {}
+    occurrences = 0
+    
+    for html_file in html_files:
+        try:
+            with phase('read', lang_dir.name), open(html_file, 'r', encoding='utf-8', newline='') as f:
+                source = f.read()
+            count('files_read')
+            count('bytes_read', html_file.stat().st_size)
+        except Exception as e:
+            log(f"    ⚠️  Skipped file {html_file.name}: {e}")
+            continue
+        
+        with phase('segment', lang_dir.name):
+            pieces, segments = segment_html(source)
+        
+        skeleton['files'][html_file.name] = pieces
+        for identifier, text in segments.items():
+            skeleton['segments'].setdefault(identifier, text)
+            pages.setdefault(identifier, []).append(html_file.name)
+        occurrences += sum(1 for piece in pieces if not isinstance(piece, str))
+        progress(f"    ✓ {html_file.name}: {len(segments)} segment(s)")
+    
+    with open(output_dir / f"{lang_dir.name}.skeleton.json", 'w', encoding='utf-8') as f:
+        json.dump(skeleton, f, ensure_ascii=False, indent=1)
+    
+    count('segments', occurrences)
+    count('unique_segments', len(skeleton['segments']))
+    progress(f"    🧩 {occurrences} segment(s), {len(skeleton['segments'])} unique")
+    
+    rows = [["id", "text", "files"]]
+    for identifier, text in skeleton['segments'].items():
+        rows.extend(cell_rows(identifier, text, [", ".join(pages[identifier])]))
+    
+    if len(rows) - 1 > len(skeleton['segments']):
+        count('segments_split', len({row[0] for row in rows[1:] if len(row) > 3}))
+        add_part_columns(rows)
+    
+    return rows
+
+
+def write_language_rows(rows, output_dir, lang_name, fmt):
+    """Write the rows of a language to output_dir/lang_name.fmt."""
+    # Plain-text formats are written directly, without the Excel conversion
+    if fmt != 'xlsx':
+        output_file = output_dir / f"{lang_name}.{fmt}"
+        with phase('write', lang_name):
+            write_rows(rows, output_file, fmt)
+        count('files_written')
+        count('bytes_written', output_file.stat().st_size)
+        progress(f"    ✅ {lang_name}.{fmt}")
+        return
+    
+    csv_file = output_dir / f"{lang_name}.csv"
+    with phase('write', lang_name):
+        with open(csv_file, mode='w', newline='') as out_lang_file:
+            writer = csv.writer(out_lang_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            writer.writerows(rows)
+        
+        # Convert CSV to Excel
+        convert_to_excel(csv_file)
+    
+    # Clean up CSV if Excel was created
+    xlsx_file = csv_file.with_suffix('.xlsx')
+    if xlsx_file.exists():
+        csv_file.unlink()
+        count('files_written')
+        count('bytes_written', xlsx_file.stat().st_size)
+        progress(f"    ✅ {lang_name}.xlsx")
+
+
 def execute(args):
     """Execute the HTML export command."""
     html_path = args.html_path
     output_dir = args.output_dir
     remove_html_tags = args.remove_html_tags
+    segments = args.segments
+    fmt = args.format
     
     # Validate HTML path
     if not html_path.exists():
@@ -41,10 +218,11 @@ def execute(args):
         # Fallback: use the immediate parent directory name
         project_name = html_path.parent.name
     
-    print(f"📁 Scanning HTML directory: {html_path}")
-    print(f"Output directory: {output_dir}")
-    print(f"🏷️ Remove HTML tags: {remove_html_tags}")
-    print()
+    log(f"📁 Scanning HTML directory: {html_path}")
+    log(f"Output directory: {output_dir}")
+    log(f"🏷️ Remove HTML tags: {remove_html_tags}")
+    log(f"🧩 Segments: {segments}")
+    log()
     
     # Get all language directories
     languages = [item for item in html_path.iterdir() if item.is_dir()]
@@ -58,49 +236,29 @@ def execute(args):
     
     # Process each language
     for lang in sorted(languages):
-        print(f"  🌍 Processing language: {lang.name}")
+        progress(f"  🌍 Processing language: {lang.name}")
         
-        csv_file = project_output_dir / f"{lang.name}.csv"
-                    
         # Get all HTML files in this language directory
         html_files = sorted([x for x in lang.iterdir() if x.suffix == '.html'])
         
         if not html_files:
-            print(f"    ⚠️  No HTML files found in {lang.name}")
+            log(f"    ⚠️  No HTML files found in {lang.name}")
             continue
 
-        with open(csv_file, mode='w', newline='') as out_lang_file:
-            writer = csv.writer(out_lang_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        if segments:
+            rows = read_html_segments(lang, html_files, project_output_dir)
+        else:
+            rows = read_html_language(lang, html_files, remove_html_tags)
             
-            for html_file in html_files:
-                try:
-                    with open(html_file, 'r', encoding='utf-8') as file_handler:
-                        lines = file_handler.readlines()
-                        joined_lines = "".join(lines)
-                        
-                        # Remove HTML tags (unless --keep-html-tags is specified)
-                        if remove_html_tags:
-                            joined_lines = re.sub('<[^<]+?>', '', joined_lines)
-                        
-                        # Trim leading and trailing whitespaces
-                        joined_lines = joined_lines.strip()
-                        
-                        writer.writerow([html_file.name, joined_lines])
-                        print(f"    ✓ {html_file.name}")
-                        
-                except Exception as e:
-                    print(f"    ⚠️  Skipped file {html_file.name}: {e}")
+            # A skeleton left by a previous --segments export no longer matches
+            stale_skeleton = project_output_dir / f"{lang.name}.skeleton.json"
+            if stale_skeleton.exists():
+                stale_skeleton.unlink()
         
-        # Convert CSV to Excel
-        convert_to_excel(csv_file)
-        
-        # Clean up CSV if Excel was created
-        xlsx_file = csv_file.with_suffix('.xlsx')
-        if xlsx_file.exists():
-            csv_file.unlink()
-            print(f"    ✅ {lang.name}.xlsx")
-    
-    print()
-    print(f"✅ Successfully exported HTML translations!")
-    print(f"   Languages: {', '.join([lang.name for lang in sorted(languages)])}")
-    print(f"   Output location: {project_output_dir}")
+        count('languages')
+        write_language_rows(rows, project_output_dir, lang.name, fmt)
+    
+    log()
+    log(f"✅ Successfully exported HTML translations!")
+    log(f"   Languages: {', '.join([lang.name for lang in sorted(languages)])}")
+    log(f"   Output location: {project_output_dir}")
@@ -2,23 +2,32 @@
 Import Excel translations back to HTML files.
 """
 from html import escape
+import json
+import math
 import os
-import re
 
-import pandas as pd
+from commands.utils.chunks import format_checksum, new_digest, parse_part
+from commands.utils.escaping import unescape_control_chars
+from commands.utils.interchange import TEXT_FORMATS, read_rows
+from commands.utils.reporting import count, log, phase, progress
+from commands.utils.segments import assemble_html
+from commands.utils.transaction import JOURNAL_NAME, FileTransaction, recover
 
 
 def normalize_excel_content(content):
     """Normalize Excel cell content and unescape supported control characters."""
-    if pd.isna(content):
+    if content is None or (isinstance(content, float) and math.isnan(content)):
         return ""
 
-    normalized_content = str(content)
-    normalized_content = re.sub(r'\\n', '\n', normalized_content)
-    normalized_content = re.sub(r'\\t', '\t', normalized_content)
-    normalized_content = re.sub(r'\\r', '\r', normalized_content)
+    return unescape_control_chars(str(content))
 
-    return normalized_content
+
+def start_transaction(output_dir, fsync=False):
+    """Roll back an interrupted import of output_dir and start a new transaction for it."""
+    restored = recover(os.path.join(output_dir, JOURNAL_NAME))
+    if restored:
+        log(f"    ⚠️  Rolled back {restored} file(s) of an interrupted import")
+    return FileTransaction(output_dir, fsync=fsync)
 
 
 def wrap_plain_text_lines_in_paragraphs(content):
@@ -31,34 +40,272 @@ def wrap_plain_text_lines_in_paragraphs(content):
     return "\n".join(f"<p>{escape(line)}</p>" for line in lines)
 
 
-def convert_excel_to_html(excel_file, output_dir, plain_text_to_html=False):
+def read_html_rows(excel_file):
+    """
+    Read the rows of an exported language file, header first.
+    
+    Plain-text interchange files are read with the standard library; pandas
+    is only imported for Excel workbooks.
+    """
+    fmt = excel_file.suffix.lstrip('.')
+    if fmt in TEXT_FORMATS:
+        return [row for row in read_rows(excel_file, fmt) if row]
+    
+    import pandas as pd
+    
+    rows = []
+    df = pd.read_excel(excel_file, sheet_name=None)
+    for sheet_name, data in df.items():
+        if not rows:
+            rows.append([str(column) for column in data.columns])
+        for _, row in data.iterrows():
+            rows.append([None if pd.isna(value) else value for value in row])
+    return rows
+
+
+def file_entries(rows):
+    """
+    Group table rows into (file name, content, checksum) entries.
+    
+    The rows of a file split by export (part column "1/3", "2/3", ...) become
+    a single entry whose content is the list of parts in order and whose
+    checksum is the one of the exported file; other entries have no checksum.
+    
+    Args:
+        rows: Table rows, header first (["file", "content"], optionally "part" and "checksum")
+        
+    Returns:
+        List of (file name, content, checksum) tuples, in table order
+        
+    Raises:
+        ValueError: If a split file has missing, duplicated or inconsistent parts
+    """
+    if not rows:
+        return []
+    
+    header = [str(column).strip().lower() if column is not None else '' for column in rows[0]]
+    part_column = header.index('part') if 'part' in header else None
+    checksum_column = header.index('checksum') if 'checksum' in header else None
+    
+    def cell(row, column):
+        return row[column] if column is not None and column < len(row) else None
+    
+    entries = []
+    split_files = {}
+    for row in rows[1:]:
+        if not row:
+            continue
+        
+        file_name = str(row[0])
+        part = cell(row, part_column)
+        if part is None or part == '':
+            entries.append((file_name, cell(row, 1), None))
+            continue
+        
+        split = split_files.get(file_name)
+        if split is None:
+            split = split_files[file_name] = {'parts': {}, 'totals': set(), 'checksums': set(), 'errors': []}
+            entries.append((file_name, split, None))
+        
+        try:
+            index, total = parse_part(part)
+        except ValueError as e:
+            split['errors'].append(str(e))
+            continue
+        if index in split['parts']:
+            split['errors'].append(f"part {index} appears twice")
+        split['parts'][index] = cell(row, 1)
+        split['totals'].add(total)
+        split['checksums'].add(cell(row, checksum_column) or None)
+    
+    problems = []
+    for position, (file_name, content, _) in enumerate(entries):
+        if not isinstance(content, dict):
+            continue
+        
+        parts, errors = content['parts'], content['errors']
+        if len(content['totals']) > 1:
+            errors.append("inconsistent part counts")
+        elif content['totals']:
+            total = next(iter(content['totals']))
+            missing = [str(index) for index in range(1, total + 1) if index not in parts]
+            if missing:
+                errors.append(f"missing part(s) {', '.join(missing)} of {total}")
+        if len(content['checksums']) > 1:
+            errors.append("inconsistent checksums")
+        
+        if errors:
+            problems.append(f"{file_name}: {', '.join(errors)}")
+            continue
+        entries[position] = (file_name, [parts[index] for index in sorted(parts)],
+                             next(iter(content['checksums'])))
+    
+    if problems:
+        raise ValueError(f"Incomplete split file(s): {'; '.join(problems)}")
+    return entries
+
+
+def check_page_table(rows, name):
+    """
+    Refuse a table of segments (html export --segments) where pages are expected.
+    
+    Its rows would otherwise be written as files named after segment ids.
+    
+    Raises:
+        ValueError: If the header is the one of a segment table
+    """
+    header = [str(column).strip().lower() for column in rows[0][:3]] if rows else []
+    if header == ["id", "text", "files"]:
+        raise ValueError(f"{name} holds segments (exported with --segments); "
+                         "import it with --segments")
+
+
+def convert_excel_to_html(excel_file, output_dir, plain_text_to_html=False, fsync=False):
     """
     Convert Excel file to HTML files.
     
     Args:
-        excel_file: Path to Excel file
+        excel_file: Path to Excel (or CSV/TSV/JSON Lines) file
         output_dir: Output directory for HTML files
     """
     # Read the Excel file
-    df = pd.read_excel(excel_file, sheet_name=None)
+    with phase('read', excel_file.stem):
+        rows = read_html_rows(excel_file)
+    count('files_read')
+    count('bytes_read', os.path.getsize(excel_file))
+    
+    check_page_table(rows, excel_file.name)
+    write_html_rows(file_entries(rows), output_dir, plain_text_to_html, label=excel_file.stem,
+                    fsync=fsync)
+
+
+def write_html_rows(rows, output_dir, plain_text_to_html=False, label=None, fsync=False):
+    """
+    Write (file name, content) rows as HTML files.
+    
+    Args:
+        rows: Iterable of (file name, cell content) pairs, without header, or of
+            (file name, content, checksum) entries from file_entries(), whose
+            content can be a list of parts joined in order
+        output_dir: Output directory for HTML files
+        plain_text_to_html: Wrap each line of plain text in a <p> element
+        label: Name used for the write phase (defaults to the output directory name)
+        fsync: Flush the files to disk before publishing them
+        
+    Returns:
+        List of the HTML file paths written
+    """
+    label = label or os.path.basename(os.path.normpath(output_dir))
+    written = []
     
     # Create the output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    for sheet_name, data in df.items():
-        for _, row in data.iterrows():
-            file_name = row.iloc[0]
-            content = normalize_excel_content(row.iloc[1])
-
-            html_content = content
-
+    # The files of a language are published together, or none of them
+    transaction = start_transaction(output_dir, fsync)
+    
+    try:
+        for row in rows:
+            file_name, raw_content = row[0], row[1]
+            checksum = row[2] if len(row) > 2 else None
+            parts = raw_content if isinstance(raw_content, list) else [raw_content]
+            digest = new_digest()
+            size = 0
+            
+            def encoded_parts():
+                # Parts are normalized, hashed and written one after the other
+                nonlocal size
+                for part in parts:
+                    data = normalize_excel_content(part).encode('utf-8')
+                    digest.update(data)
+                    size += len(data)
+                    yield data
+            
+            chunks = encoded_parts()
             if plain_text_to_html:
-                html_content = wrap_plain_text_lines_in_paragraphs(content)
+                content = b"".join(chunks).decode('utf-8')
+                data = wrap_plain_text_lines_in_paragraphs(content).encode('utf-8')
+                chunks, size = [data], len(data)
             
-            # Write the HTML content to a file
+            # Write the HTML content to a file (staged, published with the other files)
             output_file = os.path.join(output_dir, file_name)
-            with open(output_file, 'w', encoding='utf-8') as html_file:
-                html_file.write(html_content)
+            with phase('write', label):
+                transaction.write_chunks(output_file, chunks)
+            count('files_written')
+            count('bytes_written', size)
+            written.append(output_file)
+            
+            if checksum:
+                if format_checksum(digest) == checksum:
+                    count('files_verified')
+                    progress(f"    🔗 {file_name}: {len(parts)} parts joined, checksum verified")
+                else:
+                    # Expected once translated: the checksum only vouches for untouched pages,
+                    # the part numbers are what guarantee the order of the others
+                    progress(f"    🔗 {file_name}: {len(parts)} parts joined, edited since export "
+                             "(translated: the checksum only verifies untouched pages)")
+    except BaseException:
+        transaction.discard()
+        raise
+    
+    with phase('commit', label):
+        transaction.commit()
+    return written
+
+
+def convert_segments_to_html(excel_file, skeleton_file, output_dir, fsync=False):
+    """
+    Rebuild the HTML files of a language from its skeleton and translated segments.
+    
+    Segments without a translation keep their source text.
+    
+    Args:
+        excel_file: Path to the Excel (or CSV/TSV/JSON Lines) file of segments
+        skeleton_file: Path to the lang.skeleton.json file written by the export
+        output_dir: Output directory for HTML files
+        fsync: Flush the files to disk before publishing them
+        
+    Returns:
+        Number of segments left untranslated
+    """
+    with phase('read', excel_file.stem):
+        rows = read_html_rows(excel_file)
+        with open(skeleton_file, encoding='utf-8') as f:
+            skeleton = json.load(f)
+    count('files_read', 2)
+    count('bytes_read', os.path.getsize(excel_file) + os.path.getsize(skeleton_file))
+    
+    # Cells are HTML fragments, kept verbatim; the parts of a split segment are joined
+    translations = {}
+    for identifier, text, _ in file_entries(rows):
+        if isinstance(text, list):
+            text = "".join("" if part is None else str(part) for part in text)
+        translations[identifier] = "" if text is None else str(text)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    transaction = start_transaction(output_dir, fsync)
+    missing = set()
+    
+    try:
+        for file_name, pieces in skeleton['files'].items():
+            with phase('assemble', excel_file.stem):
+                html_content, file_missing = assemble_html(pieces, translations, skeleton['segments'])
+            missing.update(file_missing)
+            
+            data = html_content.encode('utf-8')
+            with phase('write', excel_file.stem):
+                transaction.write(os.path.join(output_dir, file_name), data)
+            count('files_written')
+            count('bytes_written', len(data))
+    except BaseException:
+        transaction.discard()
+        raise
+    
+    with phase('commit', excel_file.stem):
+        transaction.commit()
+    
+    count('segments', len(skeleton['segments']))
+    return len(missing)
 
 
 def execute(args):
@@ -66,6 +313,8 @@ def execute(args):
     html_path = args.html_path
     output_dir = args.output_dir
     plain_text_to_html = args.plain_text_to_html
+    segments = args.segments
+    fmt = args.format
     
     # Validate HTML path
     if not html_path.exists():
@@ -96,38 +345,52 @@ def execute(args):
     if not input_dir.exists():
         raise FileNotFoundError(f"HTML export directory not found: {input_dir}")
     
-    print(f"📥 Importing from: {input_dir}")
-    print(f"📁 Target HTML directory: {html_path}")
-    print(f"📝 Plain text to HTML: {plain_text_to_html}")
-    print()
+    log(f"📥 Importing from: {input_dir}")
+    log(f"📁 Target HTML directory: {html_path}")
+    log(f"📝 Plain text to HTML: {plain_text_to_html}")
+    log(f"🧩 Segments: {segments}")
+    log()
     
     # Get all Excel files (language files)
-    excel_files = list(input_dir.glob('*.xlsx'))
+    excel_files = list(input_dir.glob(f'*.{fmt}'))
     
     if not excel_files:
-        raise ValueError(f"No Excel files found in {input_dir}")
+        raise ValueError(f"No {fmt} files found in {input_dir}")
     
     # Process each language file
     for excel_file in sorted(excel_files):
         lang = excel_file.stem
-        print(f"  🌍 Processing language: {lang}")
+        progress(f"  🌍 Processing language: {lang}")
+        count('languages')
         
         output_directory = html_path / lang
         
         try:
-            convert_excel_to_html(
-                excel_file,
-                output_directory,
-                plain_text_to_html=plain_text_to_html,
-            )
+            if segments:
+                skeleton_file = input_dir / f"{lang}.skeleton.json"
+                if not skeleton_file.exists():
+                    log(f"    ⚠️  No skeleton {skeleton_file.name} (export with --segments), skipping")
+                    continue
+                
+                untranslated = convert_segments_to_html(excel_file, skeleton_file, output_directory,
+                                                        fsync=args.fsync)
+                if untranslated:
+                    log(f"    ⚠️  {untranslated} segment(s) without translation kept their source text")
+            else:
+                convert_excel_to_html(
+                    excel_file,
+                    output_directory,
+                    plain_text_to_html=plain_text_to_html,
+                    fsync=args.fsync,
+                )
             
             # Count HTML files created
             html_files = list(output_directory.glob('*.html'))
-            print(f"    ✅ Created {len(html_files)} HTML files")
+            progress(f"    ✅ Created {len(html_files)} HTML files")
             
         except Exception as e:
-            print(f"    ❌ Error processing {excel_file.name}: {e}")
+            log(f"    ❌ Error processing {excel_file.name}: {e}")
     
-    print()
-    print(f"✅ Successfully imported HTML translations!")
-    print(f"   Languages: {', '.join([f.stem for f in sorted(excel_files)])}")
+    log()
+    log(f"✅ Successfully imported HTML translations!")
+    log(f"   Languages: {', '.join([f.stem for f in sorted(excel_files)])}")
@@ -0,0 +1,281 @@
+"""
+Serve commands from a long-lived process over a Unix socket.
+
+The daemon keeps pandas/openpyxl imported and module discovery and parsed
+strings.xml files cached between runs. Any CLI command can be forwarded to
+it with the global --server option.
+
+Protocol (JSON Lines): the client sends a single request
+    {"argv": ["strings", "export", "..."], "cwd": "/current/directory"}
+and receives the output of the run as it is produced
+    {"stream": "stdout" | "stderr", "text": "..."}
+followed by the exit code
+    {"exit": 0}
+"""
+import argparse
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+from commands.utils import cache as resource_cache
+from commands.utils.reporting import current_report, log
+
+
+class OutputStream:
+    """Text stream sending everything written to it to the client."""
+
+    def __init__(self, send, name):
+        self.send = send
+        self.name = name
+
+    def write(self, text):
+        if text:
+            self.send({'stream': self.name, 'text': text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def client_parser_class(stdout, stderr):
+    """Return an ArgumentParser class writing help, usage and errors to the client streams."""
+
+    class ClientArgumentParser(argparse.ArgumentParser):
+
+        def _print_message(self, message, file=None):
+            # argparse writes help to sys.stdout and usage errors to sys.stderr:
+            # those of the daemon, shared by every request
+            if message:
+                (stderr if file is sys.stderr else stdout).write(message)
+
+    return ClientArgumentParser
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Run the command of one request and stream its output back."""
+
+    def handle(self):
+        send_lock = threading.Lock()
+
+        def send(message):
+            data = (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+            with send_lock:
+                self.wfile.write(data)
+                self.wfile.flush()
+
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            request = json.loads(line)
+            argv = [str(arg) for arg in request['argv']]
+            cwd = Path(request.get('cwd') or '/')
+        except (ValueError, KeyError, TypeError) as e:
+            send({'stream': 'stderr', 'text': f"\n❌ Error: invalid request: {e}\n"})
+            send({'exit': 2})
+            return
+
+        try:
+            code = self.server.run_request(argv, cwd, send)
+        except BrokenPipeError:
+            return
+        try:
+            send({'exit': code})
+        except BrokenPipeError:
+            pass
+
+
+def lock_key(args):
+    """
+    Return the key of the lock a run holds: its project path, resolved.
+
+    Commands without a project (strings diff) share a single key.
+    """
+    project = getattr(args, 'android_root', None) or getattr(args, 'html_path', None)
+    if project is None:
+        return ''
+    return str(Path(project).resolve())
+
+
+class CommandServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server running CLI commands with warm caches and per-project locks."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, create_parser, run_command, cache, report):
+        self.create_parser = create_parser
+        self.run_command = run_command
+        self.cache = cache
+        self.report = report
+        self._project_locks = {}
+        self._locks_lock = threading.Lock()
+        # tracemalloc is process-wide: one --memory-report run at a time
+        self._memory_lock = threading.Lock()
+        super().__init__(str(socket_path), RequestHandler)
+
+    def project_lock(self, key):
+        """Return the lock serializing the runs of a project."""
+        with self._locks_lock:
+            return self._project_locks.setdefault(key, threading.Lock())
+
+    def memory_lock(self, args):
+        """Return the lock serializing the runs tracking memory, or a no-op for the other runs."""
+        return self._memory_lock if args.memory_report else contextlib.nullcontext()
+
+    def run_request(self, argv, cwd, send):
+        """
+        Run a command line for a client.
+
+        Args:
+            argv: Command line arguments (without the program name)
+            cwd: Working directory of the client, relative paths are resolved from it
+            send: Callable sending a message to the client
+
+        Returns:
+            Exit code of the run
+        """
+        stdout = OutputStream(send, 'stdout')
+        stderr = OutputStream(send, 'stderr')
+
+        try:
+            args = self.create_parser(client_parser_class(stdout, stderr)).parse_args(argv)
+        except SystemExit as e:
+            # Usage errors and --help, already written to the client
+            return e.code if isinstance(e.code, int) else 2
+
+        if args.command == 'serve':
+            stderr.write("\n❌ Error: the serve command cannot be forwarded to a server\n")
+            return 2
+
+        # The daemon does not change directory, paths are made absolute instead
+        for name, value in vars(args).items():
+            if isinstance(value, Path) and not value.is_absolute():
+                setattr(args, name, cwd / value)
+
+        started = time.perf_counter()
+
+        try:
+            # Runs of the same project are serialized, different projects run concurrently
+            with self.memory_lock(args), self.project_lock(lock_key(args)), resource_cache.use(self.cache):
+                self.run_command(args, stream=stdout)
+            code = 0
+        except BrokenPipeError:
+            raise
+        except Exception as e:
+            stderr.write(f"\n❌ Error: {e}\n")
+            code = 1
+
+        if not self.report.quiet:
+            self.report.write(f"  {'✅' if code == 0 else '❌'} {' '.join(argv)} "
+                              f"({time.perf_counter() - started:.2f}s)")
+        return code
+
+
+def preload_libraries():
+    """Import the optional heavy libraries once, so that runs do not pay for it."""
+    loaded = []
+    for name in ('pandas', 'openpyxl'):
+        try:
+            __import__(name)
+            loaded.append(name)
+        except ImportError:
+            pass
+    return loaded
+
+
+def remove_stale_socket(socket_path):
+    """Remove a socket file left by a previous server, refusing if a server still answers."""
+    if not socket_path.exists():
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            socket_path.unlink()
+            return
+
+    raise ValueError(f"A server is already listening on {socket_path}")
+
+
+def forward(socket_path, argv):
+    """
+    Run a command line on a server and relay its output.
+
+    Args:
+        socket_path: Path to the server socket
+        argv: Command line arguments (without the program name and --server)
+
+    Returns:
+        Exit code of the run
+
+    Raises:
+        OSError: If the server cannot be reached (nothing was run)
+        RuntimeError: If the connection is lost during the run
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+
+        try:
+            request = {'argv': argv, 'cwd': os.getcwd()}
+            sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+
+            with sock.makefile('r', encoding='utf-8') as responses:
+                for line in responses:
+                    message = json.loads(line)
+                    if 'exit' in message:
+                        return message['exit']
+                    stream = sys.stderr if message.get('stream') == 'stderr' else sys.stdout
+                    stream.write(message.get('text', ''))
+                    stream.flush()
+        except OSError as e:
+            raise RuntimeError(f"Connection to the server lost: {e}")
+
+    raise RuntimeError("The server closed the connection before the end of the run")
+
+
+def strip_option(argv, option):
+    """Remove an option and its value ("--option VALUE" or "--option=VALUE") from argv."""
+    stripped = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(option + '='):
+            stripped.append(arg)
+    return stripped
+
+
+def execute(args):
+    """Execute the serve command."""
+    # The CLI module holds the parser and the run wrapper; imported here to avoid a cycle
+    from android_translator import create_parser, run_command
+
+    socket_path = args.socket
+    remove_stale_socket(socket_path)
+
+    loaded = preload_libraries()
+    cache = resource_cache.ResourceCache(discovery_ttl=args.discovery_ttl)
+    server = CommandServer(socket_path, create_parser, run_command, cache, current_report())
+
+    try:
+        os.chmod(socket_path, 0o600)
+        log(f"🚀 Serving on {socket_path}")
+        log(f"   Preloaded: {', '.join(loaded) if loaded else 'nothing'}")
+        log(f"   Module discovery cached for {args.discovery_ttl:g}s")
+        log(f"   Forward commands with: android-translator --server {socket_path} <command> ...")
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if socket_path.exists():
+            socket_path.unlink()
+        log(f"🛑 Server on {socket_path} stopped")
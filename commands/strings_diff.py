@@ -0,0 +1,99 @@
+"""
+Compare two strings snapshots: keys added, removed and changed per module and locale.
+"""
+import json
+
+from commands.utils.reporting import count, log, phase
+from commands.utils.snapshot import Snapshot, diff_group
+
+
+def diff_snapshots(old, new):
+    """
+    Compare every (module, locale) group of two snapshots.
+
+    Groups whose key index is byte-identical in both snapshots are skipped
+    without reading any string.
+
+    Args:
+        old: Snapshot of the earlier release
+        new: Snapshot of the later release
+
+    Returns:
+        List of dictionaries with the module, locale and the added, removed
+        and changed keys, for the groups with at least one change
+    """
+    changes = []
+    for group in sorted(set(old.groups) | set(new.groups)):
+        count('groups')
+        if group in old.groups and group in new.groups and old.hash_bytes(group) == new.hash_bytes(group):
+            continue
+
+        module_name, locale = group
+        with phase('diff', module_name):
+            result = diff_group(old, new, group)
+
+        # A group only on one side but without any string (an empty module) changes nothing
+        if not any(result.values()):
+            continue
+
+        for name in ('added', 'removed', 'changed'):
+            count(f'keys_{name}', len(result[name]))
+        changes.append({'module': module_name, 'locale': locale, **result})
+
+    return changes
+
+
+def to_json(old, new, changes):
+    """Return the changes as a JSON-serializable dictionary."""
+    return {
+        'from': old.path.name,
+        'to': new.path.name,
+        'project': new.project,
+        'changes': [
+            {
+                'module': change['module'],
+                'locale': change['locale'],
+                'added': [{'key': key, 'value': value} for key, value in change['added']],
+                'removed': [{'key': key, 'value': value} for key, value in change['removed']],
+                'changed': [{'key': key, 'old': before, 'new': after}
+                            for key, before, after in change['changed']],
+            }
+            for change in changes
+        ],
+    }
+
+
+def format_text(changes):
+    """Return the changes as text: a summary line per module and locale, then its keys."""
+    lines = []
+    for change in changes:
+        lines.append(f"{change['module']} [{change['locale']}]: {len(change['added'])} added, "
+                     f"{len(change['removed'])} removed, {len(change['changed'])} changed")
+        lines += [f"  + {key}" for key, _ in change['added']]
+        lines += [f"  - {key}" for key, _ in change['removed']]
+        lines += [f"  ~ {key}" for key, _, _ in change['changed']]
+    return '\n'.join(lines) if lines else "No changes"
+
+
+def execute(args):
+    """Execute the strings diff command."""
+    for path in (args.old, args.new):
+        if not path.exists():
+            raise FileNotFoundError(f"Snapshot does not exist: {path}")
+
+    with Snapshot(args.old) as old, Snapshot(args.new) as new:
+        changes = diff_snapshots(old, new)
+
+        if args.format == 'json':
+            report = json.dumps(to_json(old, new, changes), indent=2, ensure_ascii=False)
+        else:
+            report = format_text(changes)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+        log()
+        log(f"✅ Changes in {len(changes)} module locale(s) written to {args.output}")
+    else:
+        log(report)
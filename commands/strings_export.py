@@ -2,16 +2,27 @@
 Export Android strings.xml files to Excel format.
 """
 import csv
-import os
+import glob
+import json
 from xml.dom import minidom
 
+from commands.utils.cache import current_cache
+from commands.utils.escaping import unescape_android_string
+from commands.utils.fingerprint import FINGERPRINT_COLUMN, row_fingerprint
+from commands.utils.interchange import write_rows
+from commands.utils.manifest import Manifest
 from commands.utils.OrderedSet import OrderedSet
-from commands.utils.util import convert_to_excel, discover_android_modules
+from commands.utils.pipeline import run_pipeline
+from commands.utils.reporting import buffered, count, current_report, log, phase, progress
+from commands.utils.prefill import Prefiller, TranslationCache, load_provider
+from commands.utils.resources import index_string_folders
+from commands.utils.util import convert_to_excel, discover_android_modules, iter_android_modules
+from commands.utils.vcs import changed_string_resources
 
 
 def unescape_android_char(text):
     """Unescape Android-specific characters."""
-    return text.replace("\\'", "'")
+    return unescape_android_string(text)
 
 
 def export_to_csv(data, filename):
@@ -29,7 +40,7 @@ def export_to_csv(data, filename):
                 writer.writerow(row)
 
 
-def parse_strings_xml(file_path, strings_dict, strings_arr):
+def parse_strings_xml(file_path, strings_dict, strings_arr, content=None, non_translatable=None):
     """
     Parse a strings.xml file and extract translatable strings.
     
@@ -37,16 +48,21 @@ def parse_strings_xml(file_path, strings_dict, strings_arr):
         file_path: Path to strings.xml file
         strings_dict: Dictionary to populate with key-value pairs
         strings_arr: List to track key order
+        content: Raw bytes of the file if already read (the file is not opened again)
+        non_translatable: List to populate with the keys marked translatable="false"
     """
-    if not file_path.exists():
+    if content is None and not file_path.exists():
         return
     
     try:
-        xmldoc = minidom.parse(str(file_path))
+        if content is not None:
+            xmldoc = minidom.parseString(content)
+        else:
+            xmldoc = minidom.parse(str(file_path))
         root_node = xmldoc.getElementsByTagName("resources")
         
         if len(root_node) != 1:
-            print(f'⚠️  Invalid resource file: {file_path}. Expected a resources node.')
+            log(f'⚠️  Invalid resource file: {file_path}. Expected a resources node.')
             return
         
         node_list = root_node[0].childNodes
@@ -63,6 +79,13 @@ def parse_strings_xml(file_path, strings_dict, strings_arr):
             translatable = True if not tr else tr.nodeValue != 'false'
             
             if not translatable:
+                if non_translatable is not None and tag in ('string', 'string-array'):
+                    name = attr['name'].nodeValue
+                    if tag == 'string':
+                        non_translatable.append(name)
+                    else:
+                        items = n.getElementsByTagName("item")
+                        non_translatable.extend(f"{name},{idx}" for idx in range(len(items)))
                 continue
             
             if tag == 'string':
@@ -82,62 +105,94 @@ def parse_strings_xml(file_path, strings_dict, strings_arr):
                     strings_dict[key] = value.strip()
                     
     except Exception as e:
-        print(f'⚠️  Error parsing {file_path}: {e}')
+        log(f'⚠️  Error parsing {file_path}: {e}')
 
 
-def export_module(module_name, module_path, output_dir, project_name, default_language):
+def parse_strings_file(file_path, content):
     """
-    Export strings from a single module.
+    Parse the raw bytes of a strings.xml file.
+    
+    Returns:
+        Tuple (strings_dict, strings_arr, non_translatable) of new containers
+    """
+    strings_dict = {}
+    strings_arr = []
+    non_translatable = []
+    parse_strings_xml(file_path, strings_dict, strings_arr, content=content,
+                      non_translatable=non_translatable)
+    return strings_dict, strings_arr, non_translatable
+
+
+def read_module_sources(module_name, module_path, default_language):
+    """
+    Read the raw strings.xml bytes of every locale values folder of a module.
     
     Args:
         module_name: Name of the module
         module_path: Path to the module's src/main directory
-        output_dir: Base output directory
-        project_name: Name of the project (for organizing output)
         default_language: Default language code
         
     Returns:
-        True if export was successful, False otherwise
+        List of (language, file_path, content) tuples, or None if the module
+        has no res directory
     """
     res_path = module_path / "res"
     if not res_path.exists():
-        print(f"  ⚠️  No res directory found for module '{module_name}'")
-        return False
+        log(f"  ⚠️  No res directory found for module '{module_name}'")
+        return None
     
-    print(f"\n Module: {module_name}")
-    print(f"   Path: {module_path}")
+    progress(f"\n Module: {module_name}")
+    progress(f"   Path: {module_path}")
     
-    # Parse all values-* folders
-    language_dict = {}
-    folder_list = os.listdir(res_path)
+    sources = []
     
-    for folder in sorted(folder_list):
-        if not folder.startswith("values"):
-            continue
-        
-        # Extract language code
-        try:
-            index = folder.index("-")
-            lang = folder[index + 1:]
-        except ValueError:
-            lang = default_language
+    # Only locale folders that actually contain a strings.xml are read
+    for lang, file_path in index_string_folders(res_path, default_language).items():
+        content = file_path.read_bytes()
+        count('files_read')
+        count('bytes_read', len(content))
+        sources.append((lang, file_path, content))
+    
+    return sources
+
+
+def build_module_table(module_name, sources, fingerprints=True):
+    """
+    Parse the sources of a module and build its translation table.
+    
+    Args:
+        module_name: Name of the module
+        sources: List of (language, file_path, content) tuples from read_module_sources
+        fingerprints: Add a last column with the fingerprint of each row, used by
+            import to apply only the cells translators changed
         
-        print(f"  🌍 Processing language: {lang}")
+    Returns:
+        Tuple (data, unique_keys, languages) where data is the list of rows
+        (header first), or None if the module has nothing to export
+    """
+    # Parse the strings.xml of every locale folder
+    language_dict = {}
+    
+    for lang, file_path, content in sources:
+        progress(f"  🌍 Processing language: {lang}")
         
         language_dict[lang] = {}
         strings_dict = language_dict[lang]
         strings_arr = []
         
-        values_path = res_path / folder
-        if not values_path.is_dir():
-            continue
-        
-        file_path = values_path / "strings.xml"
-        parse_strings_xml(file_path, strings_dict, strings_arr)
+        with phase('parse', module_name):
+            cache = current_cache()
+            if cache is None:
+                parse_strings_xml(file_path, strings_dict, strings_arr, content=content)
+            else:
+                cached_dict, cached_arr, _ = cache.parsed(
+                    file_path, content, lambda: parse_strings_file(file_path, content))
+                strings_dict.update(cached_dict)
+                strings_arr.extend(cached_arr)
     
     if not language_dict:
-        print(f"  ⚠️  No language folders found in module '{module_name}'")
-        return False
+        log(f"  ⚠️  No language folders found in module '{module_name}'")
+        return None
     
     # Get all unique keys
     unique_keys = set()
@@ -146,49 +201,375 @@ def export_module(module_name, module_path, output_dir, project_name, default_la
     unique_keys = OrderedSet(sorted(unique_keys))
     
     if not unique_keys:
-        print(f"  ℹ️  No strings found in module '{module_name}'")
-        return False
+        log(f"  ℹ️  No strings found in module '{module_name}'")
+        return None
     
     # Build CSV data
-    data = [["key"] + list(language_dict.keys())]
-    
-    for key in unique_keys:
-        elements = [key]
-        for lang in language_dict:
-            strings_dict = language_dict[lang]
-            if key in strings_dict:
-                elements.append(unescape_android_char(strings_dict[key]))
-            else:
-                elements.append("")
-        data.append(elements)
+    with phase('table', module_name):
+        data = [["key"] + list(language_dict.keys())]
+        if fingerprints:
+            data[0].append(FINGERPRINT_COLUMN)
+        
+        for key in unique_keys:
+            elements = [key]
+            for lang in language_dict:
+                strings_dict = language_dict[lang]
+                if key in strings_dict:
+                    elements.append(unescape_android_char(strings_dict[key]))
+                else:
+                    elements.append("")
+            if fingerprints:
+                elements.append(row_fingerprint(elements[1:]))
+            data.append(elements)
+    
+    count('languages', len(language_dict))
+    count('keys', len(unique_keys))
+    
+    return data, unique_keys, list(language_dict.keys())
+
+
+def write_table_file(data, output_file, fmt):
+    """
+    Write rows to a single Excel (or interchange) file.
+    
+    Returns:
+        Path of the file actually written (the CSV if the Excel conversion failed)
+    """
+    # Plain-text formats are written directly, without the Excel conversion
+    if fmt != 'xlsx':
+        write_rows(data, output_file, fmt)
+        written = output_file
+    else:
+        # Export to CSV
+        csv_path = output_file.with_suffix('.csv')
+        export_to_csv(data, csv_path)
+        
+        # Convert to Excel, with the fingerprints out of the translators' way
+        convert_to_excel(csv_path, hidden_columns=(FINGERPRINT_COLUMN,))
+        
+        # Clean up CSV if Excel was created successfully
+        if output_file.exists():
+            csv_path.unlink()
+            written = output_file
+        else:
+            written = csv_path
+    
+    count('files_written')
+    count('bytes_written', written.stat().st_size)
+    return written
+
+
+def array_name(key):
+    """Return the string-array name of an "array_name,index" key, or None."""
+    return key[:key.rfind(',')] if ',' in key else None
+
+
+def split_into_shards(rows, shard_size):
+    """
+    Split table rows (without header) into consecutive key ranges.
+    
+    Each shard holds about shard_size keys; the items of a string-array are
+    never split across two shards.
+    """
+    shards = []
+    current = []
+    
+    for row in rows:
+        key = row[0]
+        if len(current) >= shard_size:
+            name = array_name(key)
+            if name is None or name != array_name(current[-1][0]):
+                shards.append(current)
+                current = []
+        current.append(row)
+    
+    if current:
+        shards.append(current)
+    
+    return shards
+
+
+def remove_stale_shards(module_output_dir, safe_module_name, keep=()):
+    """
+    Delete the shard files of a module left by an earlier export.
     
+    Args:
+        module_output_dir: Output directory of the module
+        safe_module_name: File name prefix of the module
+        keep: Names of the shard files written by this export
+    """
+    pattern = f"{glob.escape(safe_module_name)}.part[0-9][0-9][0-9].*"
+    for shard_file in module_output_dir.glob(pattern):
+        if shard_file.name not in keep:
+            shard_file.unlink()
+            count('stale_files_removed')
+
+
+def write_module_table(module_name, data, unique_keys, languages, output_dir, project_name,
+                       fmt='xlsx', shard_size=None):
+    """
+    Write the translation table of a module to its Excel (or interchange) file.
+    
+    With shard_size, modules with more keys are split into several files
+    (module.part001.xlsx, ...) by key range, and a module.shards.json index
+    records the shards in key order.
+    
+    Args:
+        module_name: Name of the module
+        data: Rows of the translation table (header first)
+        unique_keys: Keys of the table
+        languages: Language codes of the table columns
+        output_dir: Base output directory
+        project_name: Name of the project (for organizing output)
+        fmt: Output format ('xlsx', 'csv', 'tsv' or 'jsonl')
+        shard_size: Maximum number of keys per file (None to never shard)
+        
+    Returns:
+        Path of the file written, or of the shards index
+    """
     # Create output directory structure: output_dir/project_name/module_name/
     module_output_dir = output_dir / project_name / module_name
     module_output_dir.mkdir(parents=True, exist_ok=True)
     
     # Use module name as filename (replace / with _)
     safe_module_name = module_name.replace('/', '_').replace('\\', '_')
-    output_file = module_output_dir / f"{safe_module_name}.xlsx"
+    output_file = module_output_dir / f"{safe_module_name}.{fmt}"
+    index_file = module_output_dir / f"{safe_module_name}.shards.json"
     
-    # Export to CSV
-    csv_path = output_file.with_suffix('.csv')
-    export_to_csv(data, csv_path)
+    if not shard_size or len(unique_keys) <= shard_size:
+        # A stale index would take precedence over this file on import
+        if index_file.exists():
+            index_file.unlink()
+        remove_stale_shards(module_output_dir, safe_module_name)
+        
+        written = write_table_file(data, output_file, fmt)
+        progress(f"  ✅ Exported to: {written.relative_to(output_dir)}")
+        progress(f"     Strings: {len(unique_keys)}, Languages: {', '.join(languages)}")
+        return written
     
-    # Convert to Excel
-    convert_to_excel(csv_path)
+    shards = []
+    for number, rows in enumerate(split_into_shards(data[1:], shard_size), start=1):
+        shard_file = module_output_dir / f"{safe_module_name}.part{number:03d}.{fmt}"
+        written = write_table_file([data[0]] + rows, shard_file, fmt)
+        shards.append({
+            'file': written.name,
+            'first_key': rows[0][0],
+            'last_key': rows[-1][0],
+            'keys': len(rows),
+        })
     
-    # Clean up CSV if Excel was created successfully
-    xlsx_path = output_file.with_suffix('.xlsx')
-    if xlsx_path.exists():
-        csv_path.unlink()
-        print(f"  ✅ Exported to: {xlsx_path.relative_to(output_dir)}")
-        print(f"     Strings: {len(unique_keys)}, Languages: {', '.join(language_dict.keys())}")
-    else:
-        print(f"  ✅ Exported to: {csv_path.relative_to(output_dir)}")
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump({'module': module_name, 'languages': languages, 'shards': shards}, f, indent=2)
+    
+    # Shards of an earlier export with more shards (or in another format) are not in the
+    # index and would only mislead; neither would its unsharded file
+    remove_stale_shards(module_output_dir, safe_module_name, {shard['file'] for shard in shards})
+    for stale_file in (output_file, output_file.with_suffix('.csv')):
+        if stale_file.exists() and stale_file.name not in {shard['file'] for shard in shards}:
+            stale_file.unlink()
+            count('stale_files_removed')
+    
+    progress(f"  ✅ Exported to: {index_file.relative_to(output_dir)} ({len(shards)} shards)")
+    progress(f"     Strings: {len(unique_keys)}, Languages: {', '.join(languages)}")
+    return index_file
+
+
+def export_module(module_name, module_path, output_dir, project_name, default_language,
+                  fmt='xlsx', shard_size=None, prefiller=None, fingerprints=True, manifest=None):
+    """
+    Export strings from a single module.
+    
+    Args:
+        module_name: Name of the module
+        module_path: Path to the module's src/main directory
+        output_dir: Base output directory
+        project_name: Name of the project (for organizing output)
+        default_language: Default language code
+        fmt: Output format ('xlsx', 'csv', 'tsv' or 'jsonl')
+        shard_size: Maximum number of keys per file (None to never shard)
+        prefiller: Prefiller filling empty cells by machine translation (None to leave them empty)
+        fingerprints: Add the row fingerprint column
+        manifest: Manifest recording the file written for the module (optional)
+        
+    Returns:
+        True if export was successful, False otherwise
+    """
+    with phase('read', module_name):
+        sources = read_module_sources(module_name, module_path, default_language)
+    if sources is None:
+        return False
+    
+    table = build_module_table(module_name, sources, fingerprints)
+    if table is None:
+        return False
+    
+    data, unique_keys, languages = table
+    if prefiller is not None:
+        with phase('prefill', module_name):
+            prefiller.fill(module_name, data)
+    
+    with phase('write', module_name):
+        written = write_module_table(module_name, data, unique_keys, languages, output_dir,
+                                     project_name, fmt, shard_size)
+    if manifest is not None:
+        manifest.record(module_name, module_path, written, fmt)
+    count('modules')
     
     return True
 
 
+def is_module_selected(module_path, res_filter):
+    """Return True if the res directory of a module is in res_filter."""
+    return (module_path / "res").resolve() in res_filter
+
+
+def export_pipelined(android_root, output_dir, project_name, default_language,
+                     readers=2, parsers=2, writers=2, fmt='xlsx', shard_size=None,
+                     res_filter=None, prefiller=None, fingerprints=True, manifest=None):
+    """
+    Export all modules with discovery, reading, parsing and writing overlapped.
+    
+    Modules are streamed from discovery into bounded queues, so the first
+    workbook can be written while the rest of the tree is still being walked.
+    The output of each module is collected along the stages and printed in
+    one block once the module is done, so modules never interleave.
+    
+    Args:
+        android_root: Path to the Android project root
+        output_dir: Base output directory
+        project_name: Name of the project (for organizing output)
+        default_language: Default language code
+        readers: Number of threads reading strings.xml files
+        parsers: Number of threads parsing files and building tables
+        writers: Number of threads writing workbooks
+        fmt: Output format ('xlsx', 'csv', 'tsv' or 'jsonl')
+        shard_size: Maximum number of keys per file (None to never shard)
+        res_filter: Set of resolved res directories to export (None for all modules)
+        prefiller: Prefiller filling empty cells by machine translation (None to leave them empty)
+        fingerprints: Add the row fingerprint column
+        manifest: Manifest recording the file written for each module (optional)
+        
+    Returns:
+        Tuple (discovered, exported) with the number of modules found and exported
+    """
+    discovered = []
+    
+    def discover():
+        for module in iter_android_modules(android_root):
+            if res_filter is not None and not is_module_selected(module[1], res_filter):
+                continue
+            discovered.append(module)
+            yield [], module
+    
+    def buffered_stage(func):
+        # Items are (output lines, value) pairs; a skipped module keeps going with a None value
+        def run(item):
+            lines, value = item
+            if value is None:
+                return lines, None
+            with buffered(lines):
+                return lines, func(value)
+        return run
+    
+    def read(module):
+        module_name, module_path = module
+        with phase('read', module_name):
+            sources = read_module_sources(module_name, module_path, default_language)
+        return None if sources is None else (module, sources)
+    
+    def parse(item):
+        module, sources = item
+        table = build_module_table(module[0], sources, fingerprints)
+        if table is not None and prefiller is not None:
+            with phase('prefill', module[0]):
+                prefiller.fill(module[0], table[0])
+        return None if table is None else (module, table)
+    
+    def write(item):
+        (module_name, module_path), (data, unique_keys, languages) = item
+        with phase('write', module_name):
+            written = write_module_table(module_name, data, unique_keys, languages, output_dir,
+                                         project_name, fmt, shard_size)
+        if manifest is not None:
+            manifest.record(module_name, module_path, written, fmt)
+        count('modules')
+        return module_name
+    
+    exported = []
+    
+    def report(item):
+        lines, module_name = item
+        for line in lines:
+            current_report().write(line)
+        if module_name is not None:
+            exported.append(module_name)
+    
+    run_pipeline(
+        discover(),
+        [(buffered_stage(read), readers), (buffered_stage(parse), parsers), (buffered_stage(write), writers)],
+        consume=report,
+    )
+    
+    return len(discovered), len(exported)
+
+
+def export_modules(args, android_root, output_dir, project_name, default_language,
+                   res_filter=None, prefiller=None, manifest=None):
+    """Export the selected modules, sequentially or with --pipeline."""
+    if args.pipeline:
+        discovered, successful_exports = export_pipelined(
+            android_root, output_dir, project_name, default_language,
+            readers=args.readers, parsers=args.parsers, writers=args.writers,
+            fmt=args.format, shard_size=args.shard_size, res_filter=res_filter,
+            prefiller=prefiller, fingerprints=not args.no_fingerprints, manifest=manifest,
+        )
+        
+        if not discovered:
+            raise ValueError(no_modules_message(android_root, args.since))
+        
+        log()
+        log(f"✅ Export complete!")
+        log(f"   Successfully exported {successful_exports}/{discovered} module(s)")
+        log(f"   Output location: {output_dir / project_name}")
+        return
+    
+    # Discover all modules
+    with phase('discovery'):
+        modules = discover_android_modules(android_root)
+    
+    if res_filter is not None:
+        modules = [module for module in modules if is_module_selected(module[1], res_filter)]
+    
+    if not modules:
+        raise ValueError(no_modules_message(android_root, args.since))
+    
+    log(f"Found {len(modules)} module(s):")
+    for module_name, _ in modules:
+        progress(f"  • {module_name}")
+    
+    # Export each module
+    successful_exports = 0
+    for module_name, module_path in modules:
+        if export_module(module_name, module_path, output_dir, project_name, default_language,
+                         fmt=args.format, shard_size=args.shard_size, prefiller=prefiller,
+                         fingerprints=not args.no_fingerprints, manifest=manifest):
+            successful_exports += 1
+    
+    log()
+    log(f"✅ Export complete!")
+    log(f"   Successfully exported {successful_exports}/{len(modules)} module(s)")
+    log(f"   Output location: {output_dir / project_name}")
+
+
+def no_modules_message(android_root, since=None):
+    """Return the error message used when no module is found."""
+    if since:
+        return (f"None of the changed strings.xml files since {since} belong to an "
+                f"Android module in {android_root}.")
+    return (f"No Android modules found in {android_root}. "
+            "Expected to find directories with res/values folders.")
+
+
 def execute(args):
     """Execute the strings export command."""
     android_root = args.android_root
@@ -202,28 +583,44 @@ def execute(args):
     # Get project name from the root directory
     project_name = android_root.name
     
-    print(f"🔍 Discovering Android modules in: {android_root}")
-    print(f"📂 Output directory: {output_dir}")
-    print()
+    log(f"🔍 Discovering Android modules in: {android_root}")
+    log(f"📂 Output directory: {output_dir}")
+    log()
     
-    # Discover all modules
-    modules = discover_android_modules(android_root)
+    # Limit the export to modules whose strings changed on this branch
+    res_filter = None
+    if args.since:
+        with phase('changes'):
+            res_filter, changed = changed_string_resources(android_root, args.since)
+        
+        log(f"🔀 {len(changed)} strings.xml file(s) changed since {args.since}")
+        for file_path in changed:
+            progress(f"  • {file_path}")
+        log()
+        
+        if not changed:
+            log(f"✅ Nothing to export")
+            return
     
-    if not modules:
-        raise ValueError(f"No Android modules found in {android_root}. "
-                        "Expected to find directories with res/values folders.")
+    prefiller = None
+    if args.prefill:
+        cache_file = args.prefill_cache or output_dir / "translation-cache.sqlite"
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        prefiller = Prefiller(load_provider(args.prefill), TranslationCache(cache_file), default_language,
+                              batch_size=args.prefill_batch_size, concurrency=args.prefill_concurrency)
+        log(f"🤖 Pre-filling empty translations with '{args.prefill}' (cache: {cache_file})")
+        log()
     
-    print(f"Found {len(modules)} module(s):")
-    for module_name, _ in modules:
-        print(f"  • {module_name}")
+    # Lets import go straight to the modules whose files come back
+    manifest = Manifest(output_dir / project_name, android_root, default_language)
     
-    # Export each module
-    successful_exports = 0
-    for module_name, module_path in modules:
-        if export_module(module_name, module_path, output_dir, project_name, default_language):
-            successful_exports += 1
+    try:
+        export_modules(args, android_root, output_dir, project_name, default_language,
+                       res_filter, prefiller, manifest)
+    finally:
+        if prefiller is not None:
+            prefiller.cache.close()
     
-    print()
-    print(f"✅ Export complete!")
-    print(f"   Successfully exported {successful_exports}/{len(modules)} module(s)")
-    print(f"   Output location: {output_dir / project_name}")
+    if manifest.modules:
+        log(f"   Manifest: {manifest.write()}")
+
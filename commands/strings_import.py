@@ -2,16 +2,29 @@
 Import Excel translations back to Android strings.xml files.
 """
 import collections
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from xml.dom import minidom
+from xml.etree import ElementTree
+from xml.parsers import expat
 
-import openpyxl
-
+from commands.strings_export import array_name, parse_strings_file
+from commands.utils.escaping import escape_android_string, escape_legacy_cell, unescape_android_string
+from commands.utils.fingerprint import FINGERPRINT_COLUMN, cell_hash, parse_fingerprint
+from commands.utils.interchange import TEXT_FORMATS, read_rows
+from commands.utils.manifest import MANIFEST_NAME, PLAIN_TEXT_CELLS, load_manifest
+from commands.utils.reporting import count, log, phase, progress
+from commands.utils.resources import is_locale_folder_name
+from commands.utils.transaction import JOURNAL_NAME, FileTransaction, recover
 from commands.utils.util import discover_android_modules
+from commands.utils.validation import WARNING, count_errors, validate_column, write_report
 
 
 def escape_android_char(text):
     """Escape Android-specific characters."""
-    return text.replace("'", "\\'")
+    return escape_android_string(text)
 
 
 def get_original_key_order(xml_file_path):
@@ -42,7 +55,7 @@ def get_original_key_order(xml_file_path):
                             key = f"{name},{idx}"
                             key_order.append(key)
     except Exception as e:
-        print(f"  ⚠️  Could not read original XML file {xml_file_path}: {e}")
+        log(f"  ⚠️  Could not read original XML file {xml_file_path}: {e}")
     
     return key_order
 
@@ -87,34 +100,379 @@ def get_non_translatable_elements(xml_file_path):
                     position += 1
                     
     except Exception as e:
-        print(f"  ⚠️  Could not read non-translatable elements from {xml_file_path}: {e}")
+        log(f"  ⚠️  Could not read non-translatable elements from {xml_file_path}: {e}")
     
     return non_translatable_elements
 
 
-def read_xlsx(filename):
-    """Read translations from Excel file."""
+def tag_end(content, start):
+    """Return the offset just after the tag starting at start (quoted attribute values may hold '>')."""
+    quote = None
+    for position in range(start, len(content)):
+        char = content[position:position + 1]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in (b'"', b"'"):
+            quote = char
+        elif char == b'>':
+            return position + 1
+    raise ValueError("Unterminated tag")
+
+
+def element_spans(content):
+    """
+    Locate the translatable string and string-array elements of a strings.xml file.
+    
+    Args:
+        content: Raw bytes of the file
+        
+    Returns:
+        Dictionary of element name -> (start, end) byte offsets of the whole element
+        
+    Raises:
+        xml.parsers.expat.ExpatError: If the file is not well-formed
+    """
+    parser = expat.ParserCreate()
+    spans = {}
+    depth = 0
+    current = None
+    
+    def start_element(tag, attrs):
+        nonlocal depth, current
+        depth += 1
+        if depth == 2 and tag in ('string', 'string-array') and attrs.get('translatable') != 'false':
+            start = parser.CurrentByteIndex
+            end = tag_end(content, start)
+            current = (attrs.get('name'), start, end if content[end - 2:end] == b'/>' else None)
+    
+    def end_element(tag):
+        nonlocal depth, current
+        if depth == 2 and current is not None:
+            name, start, end = current
+            if end is None:
+                end = content.index(b'>', parser.CurrentByteIndex) + 1
+            spans[name] = (start, end)
+            current = None
+        depth -= 1
+    
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.Parse(content, True)
+    return spans
+
+
+def line_indent(content, start):
+    """Return the whitespace between the start of the line and offset start, or None if there is text."""
+    line_start = content.rfind(b'\n', 0, start) + 1
+    indent = content[line_start:start]
+    return indent if not indent.strip() else None
+
+
+def splice_elements(content, spans, elements):
+    """
+    Replace, remove or add elements of a strings.xml file, keeping every other byte as is.
+    
+    Args:
+        content: Raw bytes of the current file
+        spans: Element spans from element_spans
+        elements: Dictionary of element name -> new element node, or None to remove the element
+        
+    Returns:
+        The new file content
+    """
+    def render(node, indent):
+        # Same rendering as a rebuilt file, indented like the element it replaces
+        lines = node.toprettyxml(indent='    ').rstrip('\n').split('\n')
+        return ('\n' + indent.decode('utf-8')).join(lines).encode('utf-8')
+    
+    edits = []
+    appended = []
+    for name, node in elements.items():
+        if name not in spans:
+            if node is not None:
+                appended.append(node)
+            continue
+        
+        start, end = spans[name]
+        indent = line_indent(content, start)
+        if node is not None:
+            edits.append((start, end, render(node, indent or b'    ')))
+        elif indent is not None and start - len(indent) > 0:
+            # Remove the whole line: indentation and the preceding line break
+            edits.append((start - len(indent) - 1, end, b''))
+        else:
+            edits.append((start, end, b''))
+    
+    if appended:
+        closing = content.rindex(b'</resources>')
+        indent = line_indent(content, closing)
+        at = closing - len(indent) if indent is not None else closing
+        prefix = b'' if indent is not None else b'\n'
+        edits.append((at, at, prefix + b''.join(b'    ' + render(node, b'    ') + b'\n'
+                                                for node in appended)))
+    
+    for start, end, data in sorted(edits, key=lambda edit: edit[0], reverse=True):
+        content = content[:start] + data + content[end:]
+    return content
+
+
+def index_strings_xml(xml_file_path):
+    """
+    Build a key -> value hash index of the translatable strings of an XML file.
+    
+    Uses a streaming ElementTree parse instead of building a minidom document,
+    which is all that is needed to compare an existing file with a workbook.
+    Keys follow the export convention ("name" and "array_name,index") and
+    values are hashed once unescaped, so equivalent escapings compare equal.
+    """
+    index = {}
+    if not xml_file_path.exists():
+        return index
+    
+    try:
+        for _, elem in ElementTree.iterparse(str(xml_file_path)):
+            tag = elem.tag
+            if tag not in ('string', 'string-array'):
+                continue
+            
+            if elem.get('translatable') != 'false':
+                name = elem.get('name')
+                if tag == 'string':
+                    index[name] = hash(unescape_android_string((elem.text or '').strip()))
+                else:
+                    for idx, item in enumerate(elem.iter('item')):
+                        index[f"{name},{idx}"] = hash(unescape_android_string((item.text or '').strip()))
+            elem.clear()
+    except ElementTree.ParseError as e:
+        log(f"  ⚠️  Could not index XML file {xml_file_path}: {e}")
+    
+    return index
+
+
+def is_plain_text_table(header):
+    """
+    Tell whether a table was exported with plain-text cells, from its header.
+    
+    Fingerprints were added after the escaping codec, so a fingerprint column
+    means plain text. Tables without one (--no-fingerprints) are only known
+    to be plain text through their manifest entry.
+    """
+    return FINGERPRINT_COLUMN in header
+
+
+def translations_from_rows(rows, plain_text=None):
+    """
+    Build the language -> {key: escaped value} dictionary from table rows.
+    
+    Cells hold plain text and are escaped, except in tables exported before
+    the escaping codec, whose cells are still Android-escaped (see
+    is_plain_text_table).
+    
+    Tables exported with row fingerprints also get a FINGERPRINT_COLUMN entry
+    mapping each key to {'hashes': {language: hash at export} or None,
+    'changed': [languages whose cell differs from its hash]}; rows without
+    a valid fingerprint (e.g. added by translators) are changed wherever they
+    have a value.
+    """
     content = {}
-    wb = openpyxl.load_workbook(filename)
-    sheet = wb.active
-    rows = list(sheet.iter_rows(values_only=True))
     
     if len(rows) <= 0:
         return content
     
     header_tmp = rows[0]
-    lang_list = []
+    lang_columns = []
+    fingerprint_column = None
     
-    for lang in header_tmp[1:]:
-        if lang:
+    for column, lang in enumerate(header_tmp[1:], start=1):
+        if lang == FINGERPRINT_COLUMN:
+            fingerprint_column = column
+        elif lang:
             content[lang] = {}
-            lang_list.append(lang)
+            lang_columns.append((column, lang))
+    
+    languages = [lang for _, lang in lang_columns]
+    fingerprints = {} if fingerprint_column is not None else None
+    
+    if plain_text is None:
+        plain_text = is_plain_text_table(header_tmp)
+    escape = escape_android_char if plain_text else escape_legacy_cell
     
     for row in rows[1:]:
         key = row[0]
-        for idx, item in enumerate(row[1:]):
+        for column, lang in lang_columns:
+            item = row[column] if column < len(row) else None
             if item:
-                content[lang_list[idx]][key] = escape_android_char(item)
+                content[lang][key] = escape(item)
+        
+        if fingerprints is not None:
+            fingerprint = row[fingerprint_column] if fingerprint_column < len(row) else None
+            hashes = parse_fingerprint(fingerprint, languages)
+            if hashes is None:
+                changed = [lang for lang in languages if key in content[lang]]
+            else:
+                changed = [lang for column, lang in lang_columns
+                           if cell_hash(row[column] if column < len(row) else None) != hashes[lang]]
+            fingerprints[key] = {'hashes': hashes, 'changed': changed}
+    
+    if fingerprints is not None:
+        content[FINGERPRINT_COLUMN] = fingerprints
+    
+    return content
+
+
+def read_strings_values(xml_file_path):
+    """Return the key -> value dictionary of the translatable strings of an existing XML file."""
+    if not xml_file_path.exists():
+        return {}
+    strings_dict, _, _ = parse_strings_file(xml_file_path, xml_file_path.read_bytes())
+    return strings_dict
+
+
+def changed_cells(fingerprints):
+    """Return the language -> [keys] dictionary of the cells changed since export."""
+    changes = collections.defaultdict(list)
+    for key, fingerprint in fingerprints.items():
+        for lang in fingerprint['changed']:
+            changes[lang].append(key)
+    return changes
+
+
+def stale_source_keys(fingerprints, source_values, default_language):
+    """
+    Find the changed rows whose default-language value changed on disk since export.
+    
+    Args:
+        fingerprints: Row fingerprints from translations_from_rows
+        source_values: Current key -> value dictionary of the default-language strings.xml
+        default_language: Default language code
+        
+    Returns:
+        Set of keys whose translations would be based on an outdated source
+    """
+    stale = set()
+    for key, fingerprint in fingerprints.items():
+        hashes = fingerprint['hashes']
+        if not fingerprint['changed'] or hashes is None or default_language not in hashes:
+            continue
+        value = source_values.get(key)
+        if cell_hash(unescape_android_string(value) if value is not None else '') != hashes[default_language]:
+            stale.add(key)
+    return stale
+
+
+def applicable_changes(module_name, res_path, language_export_dict, default_language, issues=None):
+    """
+    Select the cells of a fingerprinted table that an import applies.
+    
+    Cells unchanged since export are left out, and so are the rows whose
+    default-language source changed on disk since export; those are
+    reported (and added to issues as warnings).
+    
+    Args:
+        module_name: Name of the module
+        res_path: Path to the module's res directory
+        language_export_dict: Dictionary of language -> {key: escaped value}
+        default_language: Default language code
+        issues: List to populate with the stale rows (skipped if None)
+        
+    Returns:
+        Dictionary of language -> [keys to apply], or None if the table has no
+        fingerprints (every cell is applied). Languages with changed cells
+        only in stale rows map to an empty list; languages without any
+        changed cell are left out.
+    """
+    fingerprints = language_export_dict.get(FINGERPRINT_COLUMN)
+    if fingerprints is None:
+        return None
+    
+    changes = changed_cells(fingerprints)
+    if not changes:
+        return changes
+    
+    # Sources are only compared on disk when there is something to apply
+    with phase('parse', module_name):
+        source_values = read_strings_values(res_path / "values" / "strings.xml")
+    stale = stale_source_keys(fingerprints, source_values, default_language)
+    
+    for key in sorted(stale):
+        log(f"  ⚠️  {module_name}/{key}: source changed since export, translations not applied")
+        if issues is not None:
+            issues.append({
+                'module': module_name,
+                'language': default_language,
+                'key': key,
+                'check': 'stale',
+                'severity': WARNING,
+                'message': 'Source changed since export, translations not applied',
+            })
+    count('stale_rows', len(stale))
+    
+    return {lang: [key for key in keys if key not in stale] for lang, keys in changes.items()}
+
+
+def read_xlsx_rows(filename):
+    """Read the rows of the active sheet of an Excel file."""
+    import openpyxl
+    
+    wb = openpyxl.load_workbook(filename, read_only=True)
+    sheet = wb.active
+    rows = list(sheet.iter_rows(values_only=True))
+    wb.close()
+    
+    return rows
+
+
+def read_xlsx(filename, plain_text=None):
+    """Read translations from Excel file."""
+    return translations_from_rows(read_xlsx_rows(filename), plain_text)
+
+
+def read_translations(filename, plain_text=None):
+    """
+    Read translations from an Excel or plain-text interchange file (by suffix).
+    
+    plain_text is passed to translations_from_rows (None: decided from the header).
+    """
+    if filename.name.endswith('.shards.json'):
+        return read_sharded_translations(filename, plain_text=plain_text)
+    fmt = filename.suffix.lstrip('.')
+    if fmt in TEXT_FORMATS:
+        return translations_from_rows(read_rows(filename, fmt), plain_text)
+    return read_xlsx(filename, plain_text)
+
+
+def read_sharded_translations(index_file, workers=None, plain_text=None):
+    """
+    Read the shards listed in a module.shards.json index and merge them.
+    
+    Shards are parsed concurrently in worker processes (workbook parsing is
+    CPU bound) and merged in index order, so keys keep their exported order.
+    
+    A forked child only gets the thread that forked it: a lock held by any
+    other thread (the handlers of the serve daemon, a pipeline stage) stays
+    locked in it forever. Workers are spawned instead when other threads run.
+    """
+    with open(index_file, encoding='utf-8') as f:
+        index = json.load(f)
+    
+    shard_files = [index_file.parent / shard['file'] for shard in index['shards']]
+    missing = [shard_file.name for shard_file in shard_files if not shard_file.exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing shard(s) listed in {index_file.name}: {', '.join(missing)}")
+    
+    if len(shard_files) > 1:
+        context = multiprocessing.get_context('spawn') if threading.active_count() > 1 else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            shard_contents = list(executor.map(read_translations, shard_files,
+                                               [plain_text] * len(shard_files)))
+    else:
+        shard_contents = [read_translations(shard_file, plain_text) for shard_file in shard_files]
+    
+    content = {}
+    for shard_content in shard_contents:
+        for lang, strings_dict in shard_content.items():
+            content.setdefault(lang, {}).update(strings_dict)
     
     return content
 
@@ -207,7 +565,142 @@ def add_elements_to_xml(doc, root_node, keys_to_process, strings_dict, non_trans
         non_translatable_index += 1
 
 
-def import_module(module_name, module_path, excel_file, default_language):
+def has_escaped_cells(language_export_dict, plain_text):
+    """Tell whether translations were read from a table exported before plain-text cells."""
+    if plain_text is None:
+        return FINGERPRINT_COLUMN not in language_export_dict
+    return not plain_text
+
+
+def warn_escaped_cells(language_export_dict, plain_text):
+    """Report a table read as exported before plain-text cells."""
+    if language_export_dict and has_escaped_cells(language_export_dict, plain_text):
+        log(f"  ⚠️  No fingerprint column or manifest entry: cells read as Android-escaped text "
+            "(export from an older version), written as they are")
+        count('escaped_tables')
+
+
+def plan_module(module_name, module_path, excel_file, default_language, plain_text=None):
+    """
+    Compare a workbook with the existing strings.xml files of a module.
+    
+    Nothing is built or written: each language is reduced to a key -> value
+    hash index on both sides and the two indexes are compared.
+    
+    Args:
+        module_name: Name of the module
+        module_path: Path to the module's src/main directory
+        excel_file: Path to the Excel file with translations
+        default_language: Default language code
+        plain_text: The table has plain-text cells (None: decided from its header)
+        
+    Returns:
+        Dictionary mapping each language to a dictionary with the sorted
+        'added', 'changed' and 'removed' keys and the 'unchanged' count,
+        or None if the workbook is missing or empty
+    """
+    if not excel_file.exists():
+        log(f"  ⚠️  Excel file not found: {excel_file}")
+        return None
+    
+    # The plan is the report itself, so the module header is kept in quiet mode
+    log(f"\n Module: {module_name}")
+    log(f"   Source: {excel_file.name}")
+    
+    with phase('read', module_name):
+        language_export_dict = read_translations(excel_file, plain_text)
+    count('files_read')
+    count('bytes_read', excel_file.stat().st_size)
+    warn_escaped_cells(language_export_dict, plain_text)
+    
+    if not language_export_dict:
+        log(f"  ⚠️  No data found in Excel file")
+        return None
+    
+    return plan_translations(module_name, module_path, language_export_dict, default_language)
+
+
+def plan_translations(module_name, module_path, language_export_dict, default_language):
+    """
+    Compare in-memory translations with the existing strings.xml files of a module.
+    
+    Args:
+        module_name: Name of the module
+        module_path: Path to the module's src/main directory
+        language_export_dict: Dictionary of language -> {key: escaped value}
+        default_language: Default language code
+        
+    Returns:
+        Dictionary mapping each language to a dictionary with the sorted
+        'added', 'changed' and 'removed' keys and the 'unchanged' count
+    """
+    res_path = module_path / "res"
+    plan = {}
+    
+    # Fingerprinted tables: only the cells the import would apply are compared
+    changes = applicable_changes(module_name, res_path, language_export_dict, default_language)
+    
+    for lang, strings_dict in language_export_dict.items():
+        if lang == FINGERPRINT_COLUMN:
+            continue
+        count('languages')
+        count('keys', len(strings_dict))
+        folder_name = "values" if lang == default_language else f"values-{lang}"
+        
+        if lang != default_language and not is_locale_folder_name(lang):
+            log(f"     ⚠️  '{lang}' is not a locale qualifier, skipping.")
+            continue
+        
+        # Import skips languages without any value, so nothing would change
+        if not strings_dict and changes is None:
+            log(f"     ⚠️  No strings to write for {folder_name}, skipping.")
+            continue
+        
+        with phase('parse', module_name):
+            existing = index_strings_xml(res_path / folder_name / "strings.xml")
+        
+        if changes is None:
+            # Every cell is applied and the keys missing from the table are dropped
+            compared = strings_dict
+            removed = [key for key in existing if key not in strings_dict]
+        else:
+            # Only the applied cells change the file; cleared ones remove their key
+            keys = changes.get(lang, [])
+            compared = {key: strings_dict[key] for key in keys if key in strings_dict}
+            removed = [key for key in keys if key not in strings_dict and key in existing]
+        
+        added = []
+        changed = []
+        for key, value in compared.items():
+            value_hash = existing.get(key)
+            if value_hash is None:
+                added.append(key)
+            elif value_hash != hash(unescape_android_string(value)):
+                changed.append(key)
+        
+        if changes is None:
+            unchanged = len(compared) - len(added) - len(changed)
+        else:
+            unchanged = len(existing) - len(changed) - len(removed)
+        
+        plan[lang] = {
+            'added': sorted(added),
+            'changed': sorted(changed),
+            'removed': sorted(removed),
+            'unchanged': unchanged,
+        }
+        
+        log(f"     {folder_name}/strings.xml: +{len(added)} ~{len(changed)} "
+              f"-{len(removed)} ={unchanged}")
+        for label, keys in (('+', added), ('~', changed), ('-', removed)):
+            for key in sorted(keys):
+                log(f"       {label} {key}")
+    
+    return plan
+
+
+def import_module(module_name, module_path, excel_file, default_language,
+                  issues=None, fail_on_error=False, fsync=False, plain_text=None):
     """
     Import strings to a single module.
     
@@ -216,61 +709,80 @@ def import_module(module_name, module_path, excel_file, default_language):
         module_path: Path to the module's src/main directory
         excel_file: Path to the Excel file with translations
         default_language: Default language code
+        issues: List to populate with validation issues (validation is skipped if None)
+        fail_on_error: Do not write languages for which validation finds an error
+        fsync: Flush the files to disk before publishing them
+        plain_text: The table has plain-text cells (None: decided from its header)
         
     Returns:
         True if import was successful, False otherwise
     """
     if not excel_file.exists():
-        print(f"  ⚠️  Excel file not found: {excel_file}")
+        log(f"  ⚠️  Excel file not found: {excel_file}")
         return False
     
-    res_path = module_path / "res"
-    
-    print(f"\n Module: {module_name}")
-    print(f"   Source: {excel_file.name}")
+    progress(f"\n Module: {module_name}")
+    progress(f"   Source: {excel_file.name}")
     
     # Read Excel file
-    language_export_dict = read_xlsx(excel_file)
+    with phase('read', module_name):
+        language_export_dict = read_translations(excel_file, plain_text)
+    count('files_read')
+    count('bytes_read', excel_file.stat().st_size)
+    warn_escaped_cells(language_export_dict, plain_text)
     
     if not language_export_dict:
-        print(f"  ⚠️  No data found in Excel file")
+        log(f"  ⚠️  No data found in Excel file")
         return False
     
-    xml_dict = {}
+    apply_translations(module_name, module_path, language_export_dict, default_language,
+                       issues, fail_on_error, fsync,
+                       escaped_cells=has_escaped_cells(language_export_dict, plain_text))
+    return True
+
+
+def render_strings_xml(module_name, string_path, strings_dict):
+    """
+    Build a strings.xml file from translations.
     
-    # Create XML documents for each language
-    for lang in language_export_dict:
-        print(f"  🌍 Processing language: {lang}")
-        
-        strings_dict = collections.OrderedDict(language_export_dict[lang])
-        doc = minidom.Document()
-        xml_dict[lang] = doc
-        root_node = doc.createElement("resources")
-        doc.appendChild(root_node)
-        
-        # Determine the output path for this language
-        folder_name = "values" if lang == default_language else f"values-{lang}"
-        lang_folder = res_path / folder_name
-        string_path = lang_folder / "strings.xml"
+    Keys already in the existing file keep their position, along with its
+    non-translatable elements; new keys are added at the end.
+    
+    Args:
+        module_name: Name of the module (for the phase timings)
+        string_path: Path to the strings.xml file that will be replaced
+        strings_dict: Dictionary of key -> escaped value
         
+    Returns:
+        The rendered file content, or None if there is no string to write
+    """
+    strings_dict = collections.OrderedDict(strings_dict)
+    doc = minidom.Document()
+    root_node = doc.createElement("resources")
+    doc.appendChild(root_node)
+    
+    with phase('parse', module_name):
         # Get the original key order from the existing XML file
         original_key_order = get_original_key_order(string_path)
         
         # Get non-translatable elements from the original XML
         non_translatable_elements = get_non_translatable_elements(string_path)
-        
-        # Separate keys into: existing (in original order) and new (not in original XML)
-        existing_keys = []
-        new_keys = []
-        
-        for key in strings_dict.keys():
-            if key in original_key_order:
-                existing_keys.append(key)
-            else:
-                new_keys.append(key)
-        
+    
+    original_positions = {key: position for position, key in enumerate(original_key_order)}
+    
+    # Separate keys into: existing (in original order) and new (not in original XML)
+    existing_keys = []
+    new_keys = []
+    
+    for key in strings_dict.keys():
+        if key in original_positions:
+            existing_keys.append(key)
+        else:
+            new_keys.append(key)
+    
+    with phase('build', module_name):
         # Sort existing keys by their original position
-        existing_keys.sort(key=lambda k: original_key_order.index(k))
+        existing_keys.sort(key=original_positions.__getitem__)
         
         # Add existing keys first (preserving original order) along with non-translatable elements
         add_elements_to_xml(doc, root_node, existing_keys, strings_dict, non_translatable_elements)
@@ -278,26 +790,244 @@ def import_module(module_name, module_path, excel_file, default_language):
         # Add new keys at the end
         add_elements_to_xml(doc, root_node, new_keys, strings_dict)
     
-    # Write XML files
-    for lang in language_export_dict:
-        folder_name = "values" if lang == default_language else f"values-{lang}"
-        lang_folder = res_path / folder_name
-        lang_folder.mkdir(parents=True, exist_ok=True)
+    # If the xml content is empty, skip writing
+    if not doc.getElementsByTagName("string") and not doc.getElementsByTagName("string-array"):
+        doc.unlink()
+        return None
+    
+    with phase('render', module_name):
+        xml_contain = doc.toprettyxml(encoding="utf-8", indent='    ')
+    
+    # Release the document, only the rendered bytes are needed
+    doc.unlink()
+    return xml_contain
+
+
+def splice_changed_elements(string_path, lang_values, changed_keys):
+    """
+    Apply the changed cells of a language to its existing strings.xml file.
+    
+    Only the elements of the changed keys are rebuilt (a string-array whole,
+    its other items taken from the current file), added or removed; the
+    rest of the file is copied byte for byte.
+    
+    Args:
+        string_path: Path to the existing strings.xml file
+        lang_values: Dictionary of key -> escaped value of the changed cells with a value
+        changed_keys: Keys of the changed cells (cleared cells remove their key)
+        
+    Returns:
+        The new file content, or None if the existing file cannot be parsed
+    """
+    content = string_path.read_bytes()
+    try:
+        spans = element_spans(content)
+    except (expat.ExpatError, ValueError) as e:
+        log(f"  ⚠️  Could not read XML file {string_path}: {e}")
+        return None
+    
+    rebuild = {array_name(key) or key for key in changed_keys}
+    current_values, _, _ = parse_strings_file(string_path, content)
+    strings_dict = {key: value for key, value in current_values.items() if array_name(key) in rebuild}
+    for key in changed_keys:
+        if key in lang_values:
+            strings_dict[key] = lang_values[key]
+        else:
+            strings_dict.pop(key, None)
+    
+    def element_order(key):
+        # The items of an array are added together, in index order
+        name = array_name(key)
+        return (key, -1) if name is None else (name, int(key[len(name) + 1:]))
+    
+    doc = minidom.Document()
+    root_node = doc.createElement("resources")
+    add_elements_to_xml(doc, root_node, sorted(strings_dict, key=element_order), strings_dict)
+    
+    # Elements left without any value are removed
+    elements = dict.fromkeys(rebuild)
+    for node in root_node.childNodes:
+        elements[node.getAttribute('name')] = node
+    
+    xml_contain = splice_elements(content, spans, elements)
+    doc.unlink()
+    return xml_contain
+
+
+def apply_translations(module_name, module_path, language_export_dict, default_language,
+                       issues=None, fail_on_error=False, fsync=False, escaped_cells=False):
+    """
+    Write in-memory translations to the strings.xml files of a module.
+    
+    Files are staged and published together at the end: if the run fails
+    midway, no strings.xml of the module is changed.
+    
+    With row fingerprints, only the cells translators changed are applied on
+    top of the current files, languages without changes are not rebuilt, and
+    rows whose source changed since export are reported and left alone.
+    
+    Args:
+        module_name: Name of the module
+        module_path: Path to the module's src/main directory
+        language_export_dict: Dictionary of language -> {key: escaped value}
+        default_language: Default language code
+        issues: List to populate with validation issues (validation is skipped if None)
+        fail_on_error: Do not write languages for which validation finds an error
+        fsync: Flush the files to disk before publishing them
+        escaped_cells: The values are Android-escaped cells written as they are
+            (tables exported before plain-text cells): only such values can start
+            with a reserved character or hold an unbalanced quote, which
+            validation then checks
         
-        string_path = lang_folder / "strings.xml"
+    Returns:
+        List of the strings.xml paths written
+    """
+    res_path = module_path / "res"
+    
+    reference = language_export_dict.get(default_language, {})
+    reference_signatures = {}
+    
+    # Roll back a previous import of this module that was interrupted midway
+    restored = recover(res_path / JOURNAL_NAME)
+    if restored:
+        log(f"  ⚠️  Rolled back {restored} file(s) of an interrupted import of '{module_name}'")
+    
+    changes = applicable_changes(module_name, res_path, language_export_dict, default_language, issues)
+    
+    # All languages of the module are published together, or none of them
+    transaction = FileTransaction(res_path, fsync=fsync)
+    try:
+        # Stream languages: each document is validated, built, written and released
+        # before the next one, so only one locale is held in memory at a time
+        for lang in list(language_export_dict):
+            if lang == FINGERPRINT_COLUMN:
+                continue
+            
+            progress(f"  🌍 Processing language: {lang}")
+            count('languages')
+            count('keys', len(language_export_dict[lang]))
+            
+            folder_name = "values" if lang == default_language else f"values-{lang}"
+            
+            # Columns of non-locale folders (values-night, values-v21, ...) are never written
+            if lang != default_language and not is_locale_folder_name(lang):
+                log(f"     ⚠️  '{lang}' is not a locale qualifier, skipping.")
+                continue
+            
+            lang_values = language_export_dict[lang]
+            
+            # Only the cells changed since export are applied, in fingerprinted tables
+            if changes is not None:
+                if lang not in changes:
+                    progress(f"     ⏭️  {folder_name}/strings.xml unchanged since export")
+                    count('languages_unchanged')
+                    continue
+                changed_keys = changes[lang]
+                if not changed_keys:
+                    # Reported above row by row: the file is left as it is
+                    log(f"     ⏭️  {folder_name}/strings.xml not changed: its edited rows are all stale")
+                    count('languages_stale')
+                    continue
+                lang_values = {key: lang_values[key] for key in changed_keys if key in lang_values}
+                count('cells_applied', len(changed_keys))
+            
+            # Validate placeholders, markup and reserved characters before building anything
+            if issues is not None:
+                with phase('validate', module_name):
+                    lang_issues = validate_column(lang, lang_values, reference, reference_signatures,
+                                                  check_reserved=escaped_cells)
+                for issue in lang_issues:
+                    issue['module'] = module_name
+                    log(f"  ❗ [{issue['severity']}] {issue['language']}/{issue['key']}: {issue['message']}")
+                issues.extend(lang_issues)
+                
+                if fail_on_error and count_errors(lang_issues):
+                    log(f"     ❌ Validation failed, {folder_name}/strings.xml not written")
+                    continue
+            
+            # Determine the output path for this language
+            lang_folder = res_path / folder_name
+            string_path = lang_folder / "strings.xml"
+            
+            if changes is not None and string_path.exists():
+                # Only the elements with a changed cell are rebuilt, every other byte is kept
+                with phase('build', module_name):
+                    xml_contain = splice_changed_elements(string_path, lang_values, changed_keys)
+                if xml_contain is None:
+                    log(f"     ❌ Could not parse {folder_name}/strings.xml, not written")
+                    continue
+            else:
+                xml_contain = render_strings_xml(module_name, string_path, lang_values)
+                if xml_contain is None:
+                    log(f"     ⚠️  No strings to write for {folder_name}, skipping.")
+                    continue
+            
+            # Staged next to the target, published with the other languages on commit
+            with phase('write', module_name):
+                transaction.write(string_path, xml_contain)
+            count('files_written')
+            count('bytes_written', len(xml_contain))
+            
+            progress(f"     ✅ {folder_name}/strings.xml")
+    except BaseException:
+        transaction.discard()
+        raise
+    
+    with phase('commit', module_name):
+        written = transaction.commit()
+    
+    return written
 
-        # If the xml content is empty, skip writing
-        if not xml_dict[lang].getElementsByTagName("string") and not xml_dict[lang].getElementsByTagName("string-array"):
-            print(f"     ⚠️  No strings to write for {folder_name}, skipping.")
-            continue
+
+def module_table_file(project_output_dir, module_name, fmt):
+    """Return the table file exported for a module: its shards index if any, else its single file."""
+    safe_module_name = module_name.replace('/', '_').replace('\\', '_')
+    module_output_dir = project_output_dir / module_name
+    
+    # Sharded exports are imported through their index
+    index_file = module_output_dir / f"{safe_module_name}.shards.json"
+    if index_file.exists():
+        return index_file
+    return module_output_dir / f"{safe_module_name}.{fmt}"
+
+
+def modules_from_manifest(manifest, android_root, project_output_dir, fmt):
+    """
+    Resolve the tables listed in an export manifest that are present.
+    
+    Only the listed paths are checked, the project is not walked.
+    
+    Args:
+        manifest: Manifest dictionary from load_manifest
+        android_root: Path to the Android project root
+        project_output_dir: Directory holding the manifest and the tables
+        fmt: Format of the tables to import
         
-        with open(string_path, 'wb') as f:
-            xml_contain = xml_dict[lang].toprettyxml(encoding="utf-8", indent='    ')
-            f.write(xml_contain)
+    Returns:
+        Tuple (modules, moved): modules is the list of (module_name, module_path,
+        table_file) tuples of the tables present, moved the list of
+        (module_name, table_file) tuples of those whose module path no longer exists
+    """
+    modules = []
+    moved = []
+    
+    for module_name, entry in manifest['modules'].items():
+        # The manifest file is used as is unless another format is imported
+        if entry.get('format') == fmt:
+            table_file = project_output_dir / entry['file']
+        else:
+            table_file = module_table_file(project_output_dir, module_name, fmt)
+        
+        if not table_file.exists():
+            continue
         
-        print(f"     ✅ {folder_name}/strings.xml")
+        module_path = android_root / entry['path']
+        if (module_path / "res").is_dir():
+            modules.append((module_name, module_path, table_file))
+        else:
+            moved.append((module_name, table_file))
     
-    return True
+    return modules, moved
 
 
 def execute(args):
@@ -316,36 +1046,105 @@ def execute(args):
     
     # Get project name from the root directory
     project_name = android_root.name
+    project_output_dir = output_dir / project_name
+    
+    if not project_output_dir.exists():
+        raise FileNotFoundError(f"Project output directory not found: {project_output_dir}")
     
-    print(f"🔍 Discovering Android modules in: {android_root}")
-    print(f"📂 Import directory: {output_dir}")
-    print()
+    exported = load_manifest(project_output_dir)
+    manifest = None if args.discover else exported
     
-    # Discover all modules in the Android project
-    modules = discover_android_modules(android_root)
+    # Modules whose tables the manifest marks as holding plain-text cells
+    plain_text_modules = set() if exported is None else {
+        module_name for module_name, entry in exported['modules'].items()
+        if entry.get('cells') == PLAIN_TEXT_CELLS
+    }
     
-    if not modules:
-        raise ValueError(f"No Android modules found in {android_root}. "
-                        "Expected to find directories with res/values folders.")
+    if manifest is None:
+        log(f"🔍 Discovering Android modules in: {android_root}")
+    else:
+        log(f"🔍 Importing into: {android_root}")
+    log(f"📂 Import directory: {output_dir}")
+    log()
     
-    print(f"Found {len(modules)} module(s) in project")
+    if manifest is not None:
+        # Start from the tables that came back, only their module paths are checked
+        with phase('manifest'):
+            modules, moved = modules_from_manifest(manifest, android_root, project_output_dir,
+                                                   args.format)
+        
+        log(f"📋 {len(modules) + len(moved)} of {len(manifest['modules'])} exported table(s) "
+            f"found through {project_output_dir / MANIFEST_NAME}")
+        if manifest.get('default_language') not in (None, default_language):
+            log(f"  ⚠️  Exported with default language '{manifest['default_language']}', "
+                f"importing with '{default_language}'")
+        
+        if moved:
+            log(f"  ⚠️  {len(moved)} module(s) moved since export, discovering modules")
+            with phase('discovery'):
+                discovered = dict(discover_android_modules(android_root))
+            for module_name, table_file in moved:
+                if module_name in discovered:
+                    modules.append((module_name, discovered[module_name], table_file))
+                else:
+                    log(f"  ⚠️  Module '{module_name}' not found in {android_root}, skipping")
+            modules.sort(key=lambda module: module[0])
+        
+        if not modules:
+            raise ValueError(f"None of the modules listed in {project_output_dir / MANIFEST_NAME} "
+                             f"has a {args.format} table to import in {android_root}. "
+                             "Use --discover to ignore the manifest.")
+    else:
+        # Discover all modules in the Android project
+        with phase('discovery'):
+            discovered = discover_android_modules(android_root)
+        
+        if not discovered:
+            raise ValueError(f"No Android modules found in {android_root}. "
+                            "Expected to find directories with res/values folders.")
+        
+        log(f"Found {len(discovered)} module(s) in project")
+        
+        # Construct path to the Excel file of each module
+        modules = [
+            (module_name, module_path, module_table_file(project_output_dir, module_name, args.format))
+            for module_name, module_path in discovered
+        ]
     
     # Import each module
     successful_imports = 0
-    project_output_dir = output_dir / project_name
+    validate = args.validate or args.validation_report or args.fail_on_error
+    issues = [] if validate else None
     
-    if not project_output_dir.exists():
-        raise FileNotFoundError(f"Project output directory not found: {project_output_dir}")
-    
-    for module_name, module_path in modules:
-        # Construct path to the Excel file for this module
-        safe_module_name = module_name.replace('/', '_').replace('\\', '_')
-        module_output_dir = project_output_dir / module_name
-        excel_file = module_output_dir / f"{safe_module_name}.xlsx"
-        
-        if import_module(module_name, module_path, excel_file, default_language):
+    for module_name, module_path, excel_file in modules:
+        plain_text = True if module_name in plain_text_modules else None
+        if args.plan:
+            if plan_module(module_name, module_path, excel_file, default_language,
+                           plain_text) is not None:
+                successful_imports += 1
+                count('modules')
+        elif import_module(module_name, module_path, excel_file, default_language,
+                           issues=issues, fail_on_error=args.fail_on_error, fsync=args.fsync,
+                           plain_text=plain_text):
             successful_imports += 1
+            count('modules')
     
-    print()
-    print(f"✅ Import complete!")
-    print(f"   Successfully imported {successful_imports}/{len(modules)} module(s)")
+    log()
+    if args.plan:
+        log(f"✅ Plan complete! No files were written.")
+        log(f"   Compared {successful_imports}/{len(modules)} module(s)")
+        return
+    
+    log(f"✅ Import complete!")
+    log(f"   Successfully imported {successful_imports}/{len(modules)} module(s)")
+    
+    if issues is not None:
+        errors = count_errors(issues)
+        log(f"   Validation: {errors} error(s), {len(issues) - errors} warning(s)")
+        
+        if args.validation_report:
+            write_report(issues, args.validation_report)
+            log(f"   Validation report: {args.validation_report}")
+        
+        if args.fail_on_error and errors:
+            raise ValueError(f"Validation found {errors} error(s); affected files were not written")
@@ -0,0 +1,71 @@
+"""
+Save the strings of every module and locale of an Android project to a snapshot file.
+"""
+from pathlib import Path
+
+from commands.strings_stats import parse_module
+from commands.utils.reporting import count, log, phase, progress
+from commands.utils.snapshot import encode_snapshot
+from commands.utils.transaction import FileTransaction
+from commands.utils.util import discover_android_modules
+
+
+def collect_groups(modules, default_language):
+    """
+    Parse the strings of every module.
+
+    Args:
+        modules: List of (module_name, module_path) tuples
+        default_language: Default language code
+
+    Returns:
+        List of (module_name, locale, strings_dict) tuples
+    """
+    groups = []
+    for module_name, module_path in modules:
+        progress(f"  📦 {module_name}")
+        with phase('parse', module_name):
+            parsed = parse_module(module_path, default_language)
+
+        for lang, (strings_dict, _) in parsed.items():
+            groups.append((module_name, lang, strings_dict))
+            count('keys', len(strings_dict))
+        count('modules')
+
+    return groups
+
+
+def execute(args):
+    """Execute the strings snapshot command."""
+    android_root = args.android_root
+    default_language = args.default_language
+
+    # Validate project path
+    if not android_root.exists():
+        raise FileNotFoundError(f"Android root path does not exist: {android_root}")
+
+    project_name = android_root.name
+    output = args.output or Path('out') / project_name / 'strings.snapshot'
+
+    with phase('discovery'):
+        modules = discover_android_modules(android_root)
+
+    if not modules:
+        raise ValueError(f"No Android modules found in {android_root}. "
+                         "Expected to find directories with res/values folders.")
+
+    groups = collect_groups(modules, default_language)
+
+    with phase('write'):
+        chunks = encode_snapshot(project_name, default_language, groups)
+        # Written aside and renamed: an interrupted run never leaves half a snapshot
+        with FileTransaction(output.parent) as transaction:
+            transaction.write_chunks(output, chunks)
+
+    size = sum(len(chunk) for chunk in chunks)
+    count('files_written')
+    count('bytes_written', size)
+
+    log()
+    log(f"✅ Snapshot of {len(modules)} module(s), {len(groups)} locale file(s) written to {output}")
+    log(f"   Size: {size:,} bytes")
@@ -0,0 +1,205 @@
+"""
+Report translation coverage of Android strings.xml files, without writing any workbook.
+"""
+import json
+
+from commands.strings_export import parse_strings_file
+from commands.utils.cache import current_cache
+from commands.utils.reporting import count, log, phase
+from commands.utils.resources import index_string_folders
+from commands.utils.util import discover_android_modules
+
+COLUMNS = ['total', 'translated', 'missing', 'stale', 'non_translatable', 'coverage']
+
+
+def parse_module(module_path, default_language):
+    """
+    Parse the strings.xml of every locale values folder of a module.
+
+    Args:
+        module_path: Path to the module's src/main directory
+        default_language: Default language code
+
+    Returns:
+        Dictionary of language -> (strings_dict, non_translatable) tuples
+    """
+    parsed = {}
+    cache = current_cache()
+
+    for lang, file_path in index_string_folders(module_path / "res", default_language).items():
+        content = file_path.read_bytes()
+        count('files_read')
+        count('bytes_read', len(content))
+
+        if cache is None:
+            strings_dict, _, non_translatable = parse_strings_file(file_path, content)
+        else:
+            strings_dict, _, non_translatable = cache.parsed(
+                file_path, content, lambda: parse_strings_file(file_path, content))
+        parsed[lang] = (strings_dict, non_translatable)
+
+    return parsed
+
+
+def coverage(translated, total):
+    """Return the translated percentage of total, rounded to one decimal."""
+    return round(100.0 * translated / total, 1) if total else 100.0
+
+
+def locale_stats(source, translations):
+    """
+    Compare the strings of a locale with the default-language strings.
+
+    Args:
+        source: Dictionary of default-language key -> value
+        translations: Dictionary of key -> value of the locale (empty if it has no strings.xml)
+
+    Returns:
+        Dictionary with the translated, missing and stale key counts: a key is
+        missing when it has no non-empty translation and stale when the locale
+        still has it but the default language no longer does
+    """
+    translated = sum(1 for key in source if translations.get(key))
+    stale = sum(1 for key in translations if key not in source)
+    return {
+        'translated': translated,
+        'missing': len(source) - translated,
+        'stale': stale,
+    }
+
+
+def module_stats(module_name, module_path, default_language):
+    """
+    Compute the coverage of a module for each of its locales.
+
+    Returns:
+        Dictionary with the module name, path, number of translatable (total)
+        and non-translatable default-language keys and the stats per locale
+    """
+    with phase('parse', module_name):
+        parsed = parse_module(module_path, default_language)
+
+    source, non_translatable = parsed.pop(default_language, ({}, []))
+
+    with phase('compare', module_name):
+        locales = {
+            lang: locale_stats(source, strings_dict)
+            for lang, (strings_dict, _) in parsed.items()
+        }
+
+    count('modules')
+    count('keys', len(source))
+
+    return {
+        'module': module_name,
+        'path': str(module_path),
+        'total': len(source),
+        'non_translatable': len(non_translatable),
+        'locales': locales,
+    }
+
+
+def collect_stats(modules, default_language):
+    """
+    Compute the coverage of every module and of the whole project.
+
+    Every locale found in the project is reported for every module: a module
+    without a values folder for a locale has all its keys missing for it.
+
+    Args:
+        modules: List of (module_name, module_path) tuples
+        default_language: Default language code
+
+    Returns:
+        Dictionary with the default language, the per-module stats and the
+        project totals per locale
+    """
+    module_results = [module_stats(name, path, default_language) for name, path in modules]
+    languages = sorted({lang for result in module_results for lang in result['locales']})
+
+    totals = {lang: dict.fromkeys(COLUMNS[:-1], 0) for lang in languages}
+    for result in module_results:
+        for lang in languages:
+            stats = result['locales'].setdefault(
+                lang, {'translated': 0, 'missing': result['total'], 'stale': 0})
+            stats['coverage'] = coverage(stats['translated'], result['total'])
+
+            for name in ('translated', 'missing', 'stale'):
+                totals[lang][name] += stats[name]
+            totals[lang]['total'] += result['total']
+            totals[lang]['non_translatable'] += result['non_translatable']
+        result['locales'] = dict(sorted(result['locales'].items()))
+
+    for stats in totals.values():
+        stats['coverage'] = coverage(stats['translated'], stats['total'])
+
+    return {
+        'default_language': default_language,
+        'modules': module_results,
+        'locales': totals,
+    }
+
+
+def format_table(stats):
+    """Return the stats as a text table: one row per module and locale, then the project totals."""
+    header = ['Module', 'Locale', 'Total', 'Translated', 'Missing', 'Stale', 'Non-transl.', 'Coverage']
+
+    def cells(module_name, lang, values):
+        return ([module_name, lang] + [str(values[name]) for name in COLUMNS[:-1]]
+                + [f"{values['coverage']:.1f}%"])
+
+    module_rows = [
+        cells(result['module'], lang, dict(values, total=result['total'],
+                                           non_translatable=result['non_translatable']))
+        for result in stats['modules']
+        for lang, values in result['locales'].items()
+    ]
+    total_rows = [cells('(all modules)', lang, values) for lang, values in stats['locales'].items()]
+
+    widths = [max(len(row[i]) for row in [header] + module_rows + total_rows)
+              for i in range(len(header))]
+    separator = '  '.join('-' * width for width in widths)
+
+    def format_row(row):
+        # Names are left-aligned, numbers right-aligned
+        return '  '.join(cell.ljust(width) if i < 2 else cell.rjust(width)
+                         for i, (cell, width) in enumerate(zip(row, widths))).rstrip()
+
+    lines = [format_row(header), separator] + [format_row(row) for row in module_rows]
+    if total_rows:
+        lines += [separator] + [format_row(row) for row in total_rows]
+    return '\n'.join(lines)
+
+
+def execute(args):
+    """Execute the strings stats command."""
+    android_root = args.android_root
+    default_language = args.default_language
+
+    # Validate project path
+    if not android_root.exists():
+        raise FileNotFoundError(f"Android root path does not exist: {android_root}")
+
+    with phase('discovery'):
+        modules = discover_android_modules(android_root)
+
+    if not modules:
+        raise ValueError(f"No Android modules found in {android_root}. "
+                         "Expected to find directories with res/values folders.")
+
+    stats = collect_stats(modules, default_language)
+    stats = {'project': android_root.name, **stats}
+
+    if args.format == 'json':
+        report = json.dumps(stats, indent=2, ensure_ascii=False)
+    else:
+        report = format_table(stats)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+        log()
+        log(f"✅ Coverage of {len(modules)} module(s) written to {args.output}")
+    else:
+        log(report)
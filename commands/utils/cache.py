@@ -0,0 +1,87 @@
+"""
+Warm caches shared by the runs of a long-lived process (see the serve command).
+
+Discovery and strings.xml parsing consult the cache of the current context,
+if any; CLI runs have none and behave exactly as before.
+"""
+import contextvars
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ResourceCache:
+    """Module discovery results and parsed strings.xml files, kept across runs."""
+
+    def __init__(self, discovery_ttl=60.0):
+        self.discovery_ttl = discovery_ttl
+        self._modules = {}
+        self._parsed = {}
+        self._lock = threading.Lock()
+
+    def modules(self, android_root, discover):
+        """
+        Return the modules of a project, discovering them at most once per discovery_ttl.
+
+        Args:
+            android_root: Path to the Android project root
+            discover: Callable returning the list of (module_name, module_path) tuples
+        """
+        key = str(android_root)
+        with self._lock:
+            cached = self._modules.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.discovery_ttl:
+            return list(cached[1])
+
+        modules = discover()
+        with self._lock:
+            self._modules[key] = (time.monotonic(), modules)
+        return list(modules)
+
+    def parsed(self, file_path, content, parse):
+        """
+        Return the parse result of a file, parsing it only if its content changed.
+
+        Args:
+            file_path: Path of the file (one entry is kept per path)
+            content: Raw bytes of the file
+            parse: Callable returning the parse result of content
+
+        Returns:
+            The parse result, shared with later calls: callers must not modify it
+        """
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        key = str(file_path)
+        with self._lock:
+            cached = self._parsed.get(key)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        result = parse()
+        with self._lock:
+            self._parsed[key] = (digest, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._modules.clear()
+            self._parsed.clear()
+
+
+_current_cache = contextvars.ContextVar('resource_cache', default=None)
+
+
+def current_cache():
+    """Return the cache of the current context, or None."""
+    return _current_cache.get()
+
+
+@contextmanager
+def use(cache):
+    """Make discovery and parsing consult cache for the duration of the block."""
+    token = _current_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _current_cache.reset(token)
@@ -0,0 +1,89 @@
+"""
+Split large cell contents into ordered parts and join them back.
+
+Excel cells hold at most 32,767 characters. Files above CHUNK_SIZE are
+exported as several rows of the same file, numbered "1/3", "2/3", ... in a
+part column, with a checksum of the whole content so that import can tell
+whether the joined parts are exactly what was exported. A translated page
+never matches its checksum: its parts are put back in order by their
+numbers alone.
+"""
+import hashlib
+
+# Below the Excel limit, with room for the few characters Excel counts twice (emoji, ...)
+CHUNK_SIZE = 30000
+
+# Preferred places to split, best first: after a line, after a tag, after a word
+BOUNDARIES = ('\n', '>', ' ')
+
+
+def split_content(content, chunk_size=CHUNK_SIZE):
+    """
+    Split content into parts of at most chunk_size characters.
+
+    Parts end at a line end, a tag end or a space when one is found in the
+    second half of the part, so markup and escape sequences stay whole.
+
+    Returns:
+        List of parts; joining them gives content back
+    """
+    parts = []
+    start = 0
+
+    while len(content) - start > chunk_size:
+        end = start + chunk_size
+        cut = end
+        for boundary in BOUNDARIES:
+            position = content.rfind(boundary, start + chunk_size // 2, end)
+            if position != -1:
+                cut = position + 1
+                break
+        else:
+            # No boundary: never separate a backslash from the character it escapes
+            while cut > start + 1 and content[cut - 1] == '\\':
+                cut -= 1
+        parts.append(content[start:cut])
+        start = cut
+
+    parts.append(content[start:])
+    return parts
+
+
+def new_digest():
+    """Return the hash object checksums are computed with, to feed incrementally."""
+    return hashlib.sha256()
+
+
+def format_checksum(digest):
+    """Return the checksum label of a hash object from new_digest()."""
+    # The prefix also keeps spreadsheets from reading an all-digit checksum as a number
+    return f"sha256:{digest.hexdigest()[:16]}"
+
+
+def content_checksum(content):
+    """Return the checksum of the UTF-8 bytes of a content."""
+    digest = new_digest()
+    digest.update(content.encode('utf-8'))
+    return format_checksum(digest)
+
+
+def format_part(index, total):
+    """Return the part label of the index-th part (1-based) of total."""
+    return f"{index}/{total}"
+
+
+def parse_part(label):
+    """
+    Parse a part label.
+
+    Returns:
+        Tuple (index, total)
+
+    Raises:
+        ValueError: If the label is not a valid "index/total" pair
+    """
+    index, separator, total = str(label).strip().partition('/')
+    index, total = int(index), int(total)
+    if not separator or not 1 <= index <= total:
+        raise ValueError(f"Invalid part '{label}'")
+    return index, total
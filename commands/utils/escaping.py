@@ -0,0 +1,139 @@
+"""
+Android string resource escaping codec.
+
+escape_android_string() turns plain text (as typed in a workbook) into the
+text content of a <string> element, and unescape_android_string() does the
+reverse, following aapt rules:
+
+- backslash escapes: \\\\ \\' \\" \\n \\t \\@ \\? and \\uXXXX
+- '@' and '?' are only special as the first character
+- outside double quotes, whitespace runs collapse to one space and leading
+  or trailing whitespace is dropped; unescaped double quotes are removed
+
+Unescaping is a single pass over one compiled alternation. Escaping only
+runs the C-level str.replace of the characters actually present (faster
+than str.translate with multi-character replacements), plus a positional
+fix-up for spaces. Both directions have fast paths for text that needs no
+change and, when unescaping, for text whose only escape is \\'.
+"""
+import re
+
+WHITESPACE = ' \t\n\r\f\v'
+
+# Character escapes, applied in this order (the backslash must come first)
+_CHAR_ESCAPES = (
+    ('\\', '\\\\'),
+    ("'", "\\'"),
+    ('"', '\\"'),
+    ('\n', '\\n'),
+    ('\t', '\\t'),
+    ('\r', '\\u000D'),
+    ('\f', '\\u000C'),
+    ('\v', '\\u000B'),
+)
+_CHAR_ESCAPE_TRIGGERS = frozenset(char for char, _ in _CHAR_ESCAPES)
+
+# Spaces aapt would drop or collapse: leading, trailing or following another space
+_SPACE_RE = re.compile(r'^ |(?<= ) | $')
+
+# Escapes, quotes and the whitespace that may change (runs, non-space
+# characters, leading or trailing); single inner spaces are left to the slices
+_UNESCAPE_RE = re.compile(
+    r'\\(u[0-9a-fA-F]{4}|.)|"|[ \t\n\r\f\v]{2,}|[\t\n\r\f\v]|^ | $', re.S
+)
+
+_SIMPLE_ESCAPES = {'n': '\n', 't': '\t'}
+
+_CONTROL_ESCAPE_RE = re.compile(r'\\([ntr])')
+_CONTROL_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+
+
+def escape_android_string(text):
+    """Escape plain text for use as the content of an Android <string> element."""
+    escaped = text
+    if not _CHAR_ESCAPE_TRIGGERS.isdisjoint(text):
+        for char, replacement in _CHAR_ESCAPES:
+            if char in escaped:
+                escaped = escaped.replace(char, replacement)
+
+    if escaped[:1] == ' ' or escaped[-1:] == ' ' or '  ' in escaped:
+        escaped = _SPACE_RE.sub(r'\\u0020', escaped)
+
+    if escaped[:1] in ('@', '?'):
+        escaped = '\\' + escaped
+
+    return escaped
+
+
+def _unescape_token(match):
+    """Replacement for a token of _UNESCAPE_RE outside double quotes."""
+    escape = match.group(1)
+    if escape is not None:
+        if len(escape) == 5:
+            return chr(int(escape[1:], 16))
+        return _SIMPLE_ESCAPES.get(escape, escape)
+    # Whitespace: dropped at the edges, collapsed to one space elsewhere
+    if match.start() == 0 or match.end() == len(match.string):
+        return ''
+    return ' '
+
+
+def unescape_android_string(text):
+    """Decode the content of an Android <string> element to plain text."""
+    if '"' not in text:
+        # Fast paths: nothing to collapse or trim, and no escape other than \'
+        if ('  ' not in text and text[:1] not in WHITESPACE and text[-1:] not in WHITESPACE
+                and '\n' not in text and '\t' not in text
+                and '\r' not in text and '\f' not in text and '\v' not in text):
+            if '\\' not in text:
+                return text
+            unescaped = text.replace("\\'", "'")
+            if '\\' not in unescaped:
+                return unescaped
+
+        # Without quotes there is no state to carry, let re.sub drive the scan
+        return _UNESCAPE_RE.sub(_unescape_token, text)
+
+    parts = []
+    position = 0
+    end = len(text)
+    in_quotes = False
+
+    for match in _UNESCAPE_RE.finditer(text):
+        parts.append(text[position:match.start()])
+        position = match.end()
+        token = match.group()
+
+        if token[0] == '\\':
+            escape = match.group(1)
+            if len(escape) == 5:
+                parts.append(chr(int(escape[1:], 16)))
+            else:
+                parts.append(_SIMPLE_ESCAPES.get(escape, escape))
+        elif token == '"':
+            in_quotes = not in_quotes
+        elif in_quotes:
+            parts.append(token)
+        elif match.start() != 0 and position != end:
+            parts.append(' ')
+
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def escape_legacy_cell(text):
+    """
+    Escape a cell of a table exported before cells held plain text.
+
+    Those exports only decoded \\' and kept every other Android escape, so
+    the cell is written as is once its single quotes are escaped again.
+    """
+    return text.replace("'", "\\'")
+
+
+def unescape_control_chars(text):
+    """Turn the literal \\n, \\t and \\r sequences of a cell into control characters."""
+    if '\\' not in text:
+        return text
+    return _CONTROL_ESCAPE_RE.sub(lambda match: _CONTROL_ESCAPES[match.group(1)], text)
+
@@ -0,0 +1,46 @@
+"""
+Per-row fingerprints of exported translation tables.
+
+Export adds a last column holding a short hash of every cell of the row as
+it was on disk (the default-language source first, as in the header). On
+import, cells that still match their hash were not touched by translators
+and are left alone, and rows whose source changed on disk since the export
+are reported instead of being applied.
+"""
+import hashlib
+
+FINGERPRINT_COLUMN = '_fingerprint'
+
+# Version prefix: also keeps spreadsheets from reading a fingerprint as a number
+FINGERPRINT_VERSION = 'v1'
+
+
+def cell_hash(value):
+    """Return the short hash of a cell value (empty cells included)."""
+    text = '' if value is None else str(value)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=4).hexdigest()
+
+
+def row_fingerprint(cells):
+    """Return the fingerprint of the language cells of a row, in column order."""
+    return ':'.join([FINGERPRINT_VERSION] + [cell_hash(cell) for cell in cells])
+
+
+def parse_fingerprint(fingerprint, languages):
+    """
+    Decode a row fingerprint.
+
+    Args:
+        fingerprint: Fingerprint cell value
+        languages: Language codes of the columns, in header order
+
+    Returns:
+        Dictionary of language -> cell hash, or None if the fingerprint is
+        missing, of another version or does not match the columns
+    """
+    if not fingerprint:
+        return None
+    parts = str(fingerprint).split(':')
+    if parts[0] != FINGERPRINT_VERSION or len(parts) != len(languages) + 1:
+        return None
+    return dict(zip(languages, parts[1:]))
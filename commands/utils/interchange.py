@@ -0,0 +1,63 @@
+"""
+Plain-text interchange formats (CSV, TSV, JSON Lines) for translation tables.
+
+These formats are read and written with the standard library only, so
+pipelines that never involve a spreadsheet skip pandas and openpyxl entirely.
+"""
+import csv
+import json
+
+FORMATS = ('xlsx', 'csv', 'tsv', 'jsonl')
+TEXT_FORMATS = ('csv', 'tsv', 'jsonl')
+
+
+def write_rows(rows, filename, fmt):
+    """
+    Write a table to a plain-text interchange file.
+
+    Args:
+        rows: List of rows, the first one being the header
+        filename: Output file path
+        fmt: One of 'csv', 'tsv' or 'jsonl'
+    """
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'jsonl':
+            header = rows[0]
+            for row in rows[1:]:
+                f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+                f.write('\n')
+        elif fmt == 'tsv':
+            writer = csv.writer(f, delimiter='\t')
+            writer.writerows(rows)
+        elif fmt == 'csv':
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            writer.writerows(rows)
+        else:
+            raise ValueError(f"Unsupported interchange format: {fmt}")
+
+
+def read_rows(filename, fmt):
+    """
+    Read a table from a plain-text interchange file.
+
+    Args:
+        filename: Input file path
+        fmt: One of 'csv', 'tsv' or 'jsonl'
+
+    Returns:
+        List of rows, the first one being the header. Missing cells are ''.
+    """
+    with open(filename, 'r', newline='', encoding='utf-8') as f:
+        if fmt == 'jsonl':
+            records = [json.loads(line) for line in f if line.strip()]
+            header = []
+            for record in records:
+                for name in record:
+                    if name not in header:
+                        header.append(name)
+            return [header] + [[record.get(name, '') for name in header] for record in records]
+        if fmt == 'tsv':
+            return list(csv.reader(f, delimiter='\t'))
+        if fmt == 'csv':
+            return list(csv.reader(f))
+    raise ValueError(f"Unsupported interchange format: {fmt}")
@@ -0,0 +1,94 @@
+"""
+Export manifest: which module each exported table belongs to.
+
+strings export writes output-dir/project/manifest.json, mapping every module
+name to its src/main path (relative to the Android root) and to its table
+file (relative to the manifest). strings import starts from the tables of
+the manifest that are present, so it only checks the paths of the modules
+that came back instead of walking the whole project. Each entry also marks
+its table as holding plain-text cells (see commands.utils.escaping).
+"""
+import json
+import threading
+from pathlib import Path
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Marks tables whose cells hold plain text, escaped again on import
+PLAIN_TEXT_CELLS = 'plain'
+
+
+class Manifest:
+    """Records the tables written by an export and saves them to the manifest."""
+
+    def __init__(self, project_output_dir, android_root, default_language):
+        self.project_output_dir = Path(project_output_dir)
+        self.android_root = Path(android_root)
+        self.default_language = default_language
+        self.modules = {}
+        self._lock = threading.Lock()
+
+    def record(self, module_name, module_path, table_file, fmt):
+        """Record the table file written for a module."""
+        module_path = Path(module_path)
+        try:
+            path = module_path.relative_to(self.android_root).as_posix()
+        except ValueError:
+            path = str(module_path)
+
+        entry = {
+            'path': path,
+            'file': Path(table_file).relative_to(self.project_output_dir).as_posix(),
+            'format': fmt,
+            'cells': PLAIN_TEXT_CELLS,
+        }
+        with self._lock:
+            self.modules[module_name] = entry
+
+    def write(self):
+        """
+        Write the manifest, keeping the entries of modules not exported this time.
+
+        Returns:
+            Path of the manifest file
+        """
+        manifest_file = self.project_output_dir / MANIFEST_NAME
+        previous = load_manifest(self.project_output_dir) or {}
+
+        modules = dict(previous.get('modules', {}))
+        with self._lock:
+            modules.update(self.modules)
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'default_language': self.default_language,
+            'modules': dict(sorted(modules.items())),
+        }
+
+        self.project_output_dir.mkdir(parents=True, exist_ok=True)
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        return manifest_file
+
+
+def load_manifest(project_output_dir):
+    """
+    Read the manifest of an export directory.
+
+    Returns:
+        The manifest dictionary, or None if there is none or it is unreadable
+    """
+    manifest_file = Path(project_output_dir) / MANIFEST_NAME
+    if not manifest_file.exists():
+        return None
+
+    try:
+        with open(manifest_file, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get('version') != MANIFEST_VERSION or not isinstance(manifest.get('modules'), dict):
+        return None
+    return manifest
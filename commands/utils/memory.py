@@ -0,0 +1,153 @@
+"""
+Opt-in memory instrumentation (tracemalloc plus RSS sampling) per module and phase.
+"""
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+
+def current_rss():
+    """Return the resident set size of the process in bytes (0 if unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # Not the current RSS but the peak so far: kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryTracker:
+    """
+    Record peak and retained allocations of each (module, phase) pair.
+
+    tracemalloc counts are process-wide, so phases running at the same time
+    on other threads (e.g. in --pipeline mode) are attributed to each other;
+    run without --pipeline for exact per-module figures.
+    """
+
+    def __init__(self, top=15, sample_interval=0.05):
+        self.top = top
+        self.sample_interval = sample_interval
+        self.records = {}
+        self.rss_start = 0
+        self.rss_peak = 0
+        self.high_water = 0
+        self.high_water_label = None
+        self.high_water_snapshot = None
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._started = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        self.rss_start = self.rss_peak = current_rss()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss()
+            with self._lock:
+                self.rss_peak = max(self.rss_peak, rss)
+                for window in self._windows:
+                    self._windows[window] = max(self._windows[window], rss)
+
+    @contextmanager
+    def track(self, module, phase):
+        window = object()
+        rss_before = current_rss()
+        with self._lock:
+            self._windows[window] = rss_before
+        traced_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            traced_after, traced_peak = tracemalloc.get_traced_memory()
+            rss_after = current_rss()
+            with self._lock:
+                rss_window_peak = max(self._windows.pop(window), rss_after)
+                self.rss_peak = max(self.rss_peak, rss_window_peak)
+
+                record = self.records.setdefault((module or '*', phase), {
+                    'calls': 0,
+                    'peak_bytes': 0,
+                    'retained_bytes': 0,
+                    'rss_peak_bytes': 0,
+                })
+                record['calls'] += 1
+                record['peak_bytes'] = max(record['peak_bytes'], traced_peak - traced_before)
+                record['retained_bytes'] += traced_after - traced_before
+                record['rss_peak_bytes'] = max(record['rss_peak_bytes'], rss_window_peak)
+
+                take_snapshot = traced_after > self.high_water
+                if take_snapshot:
+                    self.high_water = traced_after
+                    self.high_water_label = f"{module or '*'}:{phase}"
+
+            # Keep the allocation sites of the moment the most memory was held
+            if take_snapshot:
+                self.high_water_snapshot = tracemalloc.take_snapshot().filter_traces((
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, __file__),
+                ))
+
+    def to_dict(self):
+        """Return the report as a JSON-serializable dictionary (stable key order)."""
+        modules = {}
+        phases = {}
+        for (module, phase), record in sorted(self.records.items()):
+            modules.setdefault(module, {})[phase] = dict(record)
+            total = phases.setdefault(phase, {'calls': 0, 'peak_bytes': 0, 'retained_bytes': 0})
+            total['calls'] += record['calls']
+            total['peak_bytes'] = max(total['peak_bytes'], record['peak_bytes'])
+            total['retained_bytes'] += record['retained_bytes']
+
+        top_allocations = []
+        if self.high_water_snapshot is not None:
+            for stat in self.high_water_snapshot.statistics('lineno')[:self.top]:
+                frame = stat.traceback[0]
+                top_allocations.append({
+                    'site': f"{frame.filename}:{frame.lineno}",
+                    'size_bytes': stat.size,
+                    'count': stat.count,
+                })
+
+        return {
+            'rss': {
+                'start_bytes': self.rss_start,
+                'peak_bytes': self.rss_peak,
+            },
+            'traced_high_water': {
+                'bytes': self.high_water,
+                'at': self.high_water_label,
+                'top_allocations': top_allocations,
+            },
+            'phases': phases,
+            'modules': modules,
+        }
+
+    def write_json(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
@@ -0,0 +1,106 @@
+"""
+Bounded-queue pipeline used to overlap I/O and CPU work between stages.
+"""
+import contextvars
+import queue
+import threading
+
+# Sentinel pushed through the queues to tell workers that their input is exhausted
+_DONE = object()
+
+
+def run_pipeline(source, stages, queue_size=4, consume=None):
+    """
+    Stream items from a source through a chain of concurrent stages.
+
+    Every stage runs on its own pool of worker threads and is connected to the
+    next one by a bounded queue, so a slow stage applies back-pressure instead
+    of letting items pile up in memory. Exceptions raised by a stage are kept
+    and the failing item is dropped; the first one is re-raised once the whole
+    pipeline has drained. Worker threads run in a copy of the caller's context,
+    so context variables (such as the current run report) are visible to them.
+    Output meant to stay in order is best written from consume, the only
+    step that runs on the caller's thread.
+
+    Args:
+        source: Iterable producing the input items (consumed on its own thread)
+        stages: List of (function, workers) tuples. Each function receives an
+            item and returns the input for the next stage, or None to drop it
+        queue_size: Maximum number of items buffered between two stages
+        consume: Callable receiving each value of the last stage as it
+            arrives, on the caller's thread (exceptions are kept like those
+            of the stages)
+
+    Returns:
+        List of the values returned by the last stage, in completion order
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    errors = []
+    threads = []
+
+    def feed():
+        try:
+            for item in source:
+                queues[0].put(item)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            for _ in range(max(1, stages[0][1])):
+                queues[0].put(_DONE)
+
+    def work(func, inbox, outbox):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            try:
+                result = func(item)
+            except Exception as e:
+                errors.append(e)
+                continue
+            if result is not None:
+                outbox.put(result)
+
+    def close(workers, outbox, next_workers):
+        # Once every worker of a stage is done, release the next stage
+        for worker in workers:
+            worker.join()
+        for _ in range(next_workers):
+            outbox.put(_DONE)
+
+    def spawn(target, *args):
+        context = contextvars.copy_context()
+        return threading.Thread(target=context.run, args=(target,) + args, daemon=True)
+
+    threads.append(spawn(feed))
+
+    for index, (func, workers) in enumerate(stages):
+        inbox, outbox = queues[index], queues[index + 1]
+        stage_threads = [spawn(work, func, inbox, outbox) for _ in range(max(1, workers))]
+        next_workers = stages[index + 1][1] if index + 1 < len(stages) else 1
+        threads.extend(stage_threads)
+        threads.append(spawn(close, stage_threads, outbox, max(1, next_workers)))
+
+    for thread in threads:
+        thread.start()
+
+    results = []
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        results.append(item)
+        if consume is not None:
+            # Keep draining: the stages would block on a full queue otherwise
+            try:
+                consume(item)
+            except Exception as e:
+                errors.append(e)
+
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return results
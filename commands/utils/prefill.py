@@ -0,0 +1,264 @@
+"""
+Machine translation pre-fill of empty cells before human review.
+
+Providers implement TranslationProvider.translate(), a coroutine that
+translates a batch of texts. Batches are sent concurrently up to a limit,
+and every result is stored in a persistent TranslationCache keyed by
+(source text, target language), so a text is never translated twice.
+"""
+import asyncio
+import hashlib
+import importlib
+import sqlite3
+import threading
+
+from commands.utils.fingerprint import FINGERPRINT_COLUMN
+from commands.utils.reporting import count, log, progress
+from commands.utils.resources import to_bcp47
+
+
+class TranslationProvider:
+    """Interface of machine translation providers."""
+
+    name = None
+
+    async def translate(self, texts, source_language, target_language):
+        """
+        Translate a batch of texts.
+
+        Args:
+            texts: List of plain texts (placeholders and markup included)
+            source_language: BCP 47 code of the source language (e.g. 'en')
+            target_language: BCP 47 code of the target language (e.g. 'pt-BR')
+
+        Returns:
+            List of translations, in the order of texts
+        """
+        raise NotImplementedError
+
+
+class PseudoProvider(TranslationProvider):
+    """
+    Deterministic offline stand-in: prefixes each text with the target language.
+
+    Placeholders and markup are kept as they are, so pre-filled cells pass
+    import validation. Useful for tests, demos and checking layouts.
+    """
+
+    name = 'pseudo'
+
+    async def translate(self, texts, source_language, target_language):
+        return [f"[{target_language}] {text}" for text in texts]
+
+
+PROVIDERS = {
+    PseudoProvider.name: PseudoProvider,
+}
+
+
+def load_provider(spec):
+    """
+    Create a provider from a registered name or a 'package.module:ClassName' path.
+
+    Args:
+        spec: Provider name (see PROVIDERS) or import path of a TranslationProvider subclass
+
+    Returns:
+        TranslationProvider instance
+
+    Raises:
+        ValueError: If the provider cannot be found
+    """
+    if spec in PROVIDERS:
+        return PROVIDERS[spec]()
+
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError(f"Unknown translation provider '{spec}'. "
+                         f"Use one of {', '.join(sorted(PROVIDERS))} or 'package.module:ClassName'")
+    try:
+        provider_class = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Cannot load translation provider '{spec}': {e}")
+
+    return provider_class()
+
+
+class TranslationCache:
+    """Persistent SQLite cache of machine translations keyed by (source text, target language)."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(filename), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " source_hash TEXT NOT NULL,"
+                " target_language TEXT NOT NULL,"
+                " source TEXT NOT NULL,"
+                " translation TEXT NOT NULL,"
+                " provider TEXT,"
+                " PRIMARY KEY (source_hash, target_language))"
+            )
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, texts, target_language):
+        """Return a dictionary of source text -> cached translation for the texts found."""
+        found = {}
+        texts = list(texts)
+        with self._lock:
+            # Stay under SQLite's bound parameter limit
+            for start in range(0, len(texts), 500):
+                chunk = {self._hash(text): text for text in texts[start:start + 500]}
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT source_hash, source, translation FROM translations"
+                    f" WHERE target_language = ? AND source_hash IN ({placeholders})",
+                    [target_language, *chunk],
+                )
+                for source_hash, source, translation in rows:
+                    if chunk.get(source_hash) == source:
+                        found[source] = translation
+        return found
+
+    def put_many(self, translations, target_language, provider=None):
+        """Store a dictionary of source text -> translation."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                [(self._hash(source), target_language, source, translation, provider)
+                 for source, translation in translations.items()],
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class Prefiller:
+    """Fill the empty cells of translation tables from the cache and a provider."""
+
+    def __init__(self, provider, cache, default_language, batch_size=50, concurrency=4):
+        self.provider = provider
+        self.cache = cache
+        self.default_language = default_language
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+
+    def fill(self, module_name, data):
+        """
+        Pre-fill the empty cells of a table in place.
+
+        Args:
+            module_name: Name of the module (for messages)
+            data: Table rows, header first (key column, then one column per language)
+
+        Returns:
+            Number of cells filled
+        """
+        header = data[0]
+        if self.default_language not in header:
+            log(f"  ⚠️  No '{self.default_language}' column in module '{module_name}', nothing to pre-fill")
+            return 0
+
+        source_column = header.index(self.default_language)
+
+        # Rows whose source has a value but whose translation is missing, per language column
+        pending = {}
+        for column, lang in enumerate(header):
+            if column == 0 or column == source_column or lang == FINGERPRINT_COLUMN:
+                continue
+            rows = [row for row in data[1:] if row[source_column] and not row[column]]
+            if rows:
+                pending[column] = rows
+
+        if not pending:
+            return 0
+
+        translations = self.translations({
+            header[column]: {row[source_column] for row in rows}
+            for column, rows in pending.items()
+        })
+
+        filled = 0
+        for column, rows in pending.items():
+            lang_translations = translations[header[column]]
+            lang_filled = 0
+            for row in rows:
+                translation = lang_translations.get(row[source_column])
+                if translation:
+                    row[column] = translation
+                    lang_filled += 1
+            progress(f"  🤖 Pre-filled {header[column]}: {lang_filled}/{len(rows)} cell(s)")
+            filled += lang_filled
+
+        count('prefilled', filled)
+        return filled
+
+    def translations(self, texts_by_language):
+        """
+        Translate texts from the cache first, then with the provider.
+
+        Args:
+            texts_by_language: Dictionary of language -> set of source texts
+
+        Returns:
+            Dictionary of language -> {source text: translation}; texts whose
+            translation failed are missing
+        """
+        translations = {}
+        missing = {}
+        for lang, texts in texts_by_language.items():
+            translations[lang] = self.cache.get_many(texts, to_bcp47(lang))
+            count('prefill_cache_hits', len(translations[lang]))
+            lang_missing = sorted(text for text in texts if text not in translations[lang])
+            if lang_missing:
+                missing[lang] = lang_missing
+
+        if missing:
+            # One event loop per table, so the concurrency limit spans all its languages
+            translated = asyncio.run(self._translate(missing))
+            provider_name = self.provider.name or type(self.provider).__name__
+            for lang, lang_translated in translated.items():
+                self.cache.put_many(lang_translated, to_bcp47(lang), provider_name)
+                translations[lang].update(lang_translated)
+
+        return translations
+
+    async def _translate(self, texts_by_language):
+        """Send texts to the provider in concurrent batches; failed batches are left out."""
+        source_language = to_bcp47(self.default_language)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def translate_batch(lang, batch):
+            target_language = to_bcp47(lang)
+            async with semaphore:
+                try:
+                    results = await self.provider.translate(batch, source_language, target_language)
+                except Exception as e:
+                    log(f"  ⚠️  Translation of {len(batch)} text(s) to {target_language} failed: {e}")
+                    count('prefill_errors')
+                    return lang, {}
+            if len(results) != len(batch):
+                log(f"  ⚠️  Provider returned {len(results)} translation(s) for {len(batch)} text(s), "
+                    f"batch ignored")
+                count('prefill_errors')
+                return lang, {}
+            count('prefill_requests')
+            count('prefill_translated', len(batch))
+            return lang, dict(zip(batch, results))
+
+        batches = [
+            (lang, texts[start:start + self.batch_size])
+            for lang, texts in texts_by_language.items()
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        translated = {lang: {} for lang in texts_by_language}
+        for lang, results in await asyncio.gather(*(translate_batch(lang, batch)
+                                                    for lang, batch in batches)):
+            translated[lang].update(results)
+        return translated
@@ -0,0 +1,145 @@
+"""
+Console output and run metrics shared by all commands.
+
+Commands write through log() and progress() instead of print() so that
+per-item output can be silenced with --quiet, and record counters and phase
+durations that can be written as JSON with --metrics-json.
+"""
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class RunReport:
+    """Output settings, counters and phase durations of a single command run."""
+
+    def __init__(self, command, quiet=False, stream=None, memory=None):
+        self.command = command
+        self.quiet = quiet
+        self.stream = stream
+        self.memory = memory
+        self.counters = {}
+        self.phases = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def write(self, message):
+        print(message, file=self.stream or sys.stdout)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def phase(self, name, module=None):
+        start = time.perf_counter()
+        try:
+            if self.memory is None:
+                yield
+            else:
+                with self.memory.track(module, name):
+                    yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def to_dict(self):
+        """Return the metrics as a JSON-serializable dictionary."""
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            counters = dict(sorted(self.counters.items()))
+            phases = {name: round(seconds, 6) for name, seconds in sorted(self.phases.items())}
+        return {
+            'command': self.command,
+            'duration_seconds': round(elapsed, 6),
+            'counters': counters,
+            'phases_seconds': phases,
+            'items_per_second': {
+                name: round(value / elapsed, 3) if elapsed > 0 else None
+                for name, value in counters.items()
+            },
+        }
+
+    def write_json(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class BufferedReport:
+    """Report of one item of a concurrent run: its messages are kept, the rest goes to the run."""
+
+    def __init__(self, report, lines):
+        self.report = report
+        self.quiet = report.quiet
+        self.lines = lines
+
+    def write(self, message):
+        self.lines.append(message)
+
+    def count(self, name, amount=1):
+        self.report.count(name, amount)
+
+    def phase(self, name, module=None):
+        return self.report.phase(name, module)
+
+
+# Report used when no run has been started (e.g. when commands are called as a library)
+_default_report = RunReport('default')
+_current_report = contextvars.ContextVar('current_report', default=None)
+
+
+def current_report():
+    """Return the report of the run in progress."""
+    return _current_report.get() or _default_report
+
+
+@contextmanager
+def run(command, quiet=False, stream=None, memory=None):
+    """Start a run; log(), progress(), count() and phase() report to it."""
+    report = RunReport(command, quiet=quiet, stream=stream, memory=memory)
+    token = _current_report.set(report)
+    try:
+        yield report
+    finally:
+        _current_report.reset(token)
+
+
+@contextmanager
+def buffered(lines):
+    """Collect the messages of the block in lines instead of printing them (see BufferedReport)."""
+    token = _current_report.set(BufferedReport(current_report(), lines))
+    try:
+        yield
+    finally:
+        _current_report.reset(token)
+
+
+def log(message=''):
+    """Print a message, even in quiet mode (summaries, warnings and errors)."""
+    current_report().write(message)
+
+
+def progress(message):
+    """Print a per-item progress message, unless the run is quiet."""
+    report = current_report()
+    if not report.quiet:
+        report.write(message)
+
+
+def count(name, amount=1):
+    """Increment a counter of the current run."""
+    current_report().count(name, amount)
+
+
+def phase(name, module=None):
+    """
+    Context manager accumulating the duration of a phase of the current run.
+    
+    When memory tracking is enabled, allocations are also recorded for the
+    (module, phase) pair. Phases should not be nested.
+    """
+    return current_report().phase(name, module)
@@ -0,0 +1,106 @@
+"""
+Android resource folder qualifiers: tell locale folders (values-es, values-pt-rBR,
+values-b+sr+Latn) apart from other configurations (values-night, values-v21,
+values-sw600dp, values-land, ...) and index the folders holding strings.xml.
+"""
+import os
+import re
+
+# Language (ISO 639-1/2) with an optional region (ISO 3166-1 alpha-2 or UN M.49)
+LEGACY_LOCALE_RE = re.compile(r'^[a-z]{2,3}(?:-r(?:[A-Z]{2}|[0-9]{3}))?$')
+
+# BCP 47 tag in resource form: b+language[+script][+region][+variant...]
+BCP47_LOCALE_RE = re.compile(r'^b\+[a-z]{2,3}(?:\+[a-zA-Z0-9]{2,8})*$')
+
+# Non-locale qualifiers that would otherwise look like a language code
+NON_LOCALE_QUALIFIERS = frozenset({'car'})
+
+
+def locale_qualifier(folder_name):
+    """
+    Return the locale qualifier of a values folder.
+
+    Args:
+        folder_name: Name of a res/ sub-folder
+
+    Returns:
+        '' for "values", the locale (e.g. 'pt-rBR') for a folder qualified
+        by a locale only, or None for any other folder
+    """
+    if folder_name == 'values':
+        return ''
+    if not folder_name.startswith('values-'):
+        return None
+
+    qualifier = folder_name[len('values-'):]
+    if qualifier in NON_LOCALE_QUALIFIERS:
+        return None
+    if LEGACY_LOCALE_RE.match(qualifier) or BCP47_LOCALE_RE.match(qualifier):
+        return qualifier
+    return None
+
+
+def is_locale_folder_name(lang):
+    """Return True if values-<lang> is a locale folder."""
+    return locale_qualifier(f"values-{lang}") is not None
+
+
+def to_bcp47(lang):
+    """
+    Convert a locale qualifier to a BCP 47 language tag.
+
+    Args:
+        lang: Locale qualifier (e.g. 'fr', 'pt-rBR', 'b+sr+Latn')
+
+    Returns:
+        BCP 47 tag (e.g. 'fr', 'pt-BR', 'sr-Latn')
+    """
+    if lang.startswith('b+'):
+        return '-'.join(lang[2:].split('+'))
+    language, _, region = lang.partition('-r')
+    return f"{language}-{region}" if region else language
+
+
+def index_string_folders(res_path, default_language):
+    """
+    Index the locale folders of a res directory that contain a strings.xml.
+
+    Args:
+        res_path: Path to the res directory
+        default_language: Language code used for the unqualified "values" folder
+
+    Returns:
+        Dictionary of language -> strings.xml path, in folder name order
+    """
+    index = {}
+
+    try:
+        entries = sorted(os.scandir(res_path), key=lambda entry: entry.name)
+    except OSError:
+        return index
+
+    for entry in entries:
+        lang = locale_qualifier(entry.name)
+        if lang is None or not entry.is_dir():
+            continue
+
+        strings_path = res_path / entry.name / "strings.xml"
+        if strings_path.is_file():
+            index[lang or default_language] = strings_path
+
+    return index
+
+
+def has_string_folders(res_path):
+    """Return True if a res directory has at least one locale folder with a strings.xml."""
+    try:
+        entries = list(os.scandir(res_path))
+    except OSError:
+        return False
+
+    return any(
+        locale_qualifier(entry.name) is not None
+        and entry.is_dir()
+        and os.path.isfile(os.path.join(entry.path, "strings.xml"))
+        for entry in entries
+    )
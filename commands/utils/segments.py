@@ -0,0 +1,169 @@
+"""
+Split HTML pages into translatable text segments and rebuild them losslessly.
+
+Pages are parsed with the standard library's event-based HTMLParser. Each
+event is located in the source by its offset, so segments are exact slices
+of the page: a segment is a run of text and inline markup such as <b> or
+<a href="..."> between two block-level tags. Everything else (block
+tags, comments, scripts, styles, whitespace around segments) is kept in a
+skeleton, and pasting translated segments back into it gives the page again.
+
+Segment IDs are a hash of the segment source, so identical paragraphs share
+one ID across the pages of a language and are only translated once.
+"""
+import hashlib
+import re
+from html.parser import HTMLParser
+
+# Tags that do not break a segment
+INLINE_TAGS = frozenset({
+    'a', 'abbr', 'b', 'bdi', 'bdo', 'br', 'cite', 'code', 'data', 'dfn', 'em', 'i',
+    'kbd', 'mark', 'q', 's', 'samp', 'small', 'span', 'strong', 'sub', 'sup', 'time',
+    'u', 'var', 'wbr',
+})
+
+# Tags whose content is never translated
+RAW_TEXT_TAGS = frozenset({'script', 'style'})
+
+# Text with something to translate once tags and character references are removed
+_WORD_RE = re.compile(r'\w')
+_MARKUP_RE = re.compile(r'<[^>]*>|&[#\w]+;?')
+
+TEXT, INLINE, SPACE, BREAK = 'text', 'inline', 'space', 'break'
+
+
+def segment_id(text):
+    """Return the stable ID of a segment source."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+class _EventRecorder(HTMLParser):
+    """Record the offset and kind of every parser event."""
+
+    def __init__(self, source):
+        super().__init__(convert_charrefs=False)
+        self.events = []
+        self._raw_text_tag = None
+        # getpos() counts lines on '\n' only (not on '\r' or other separators)
+        self._line_offsets = [0] + [match.end() for match in re.finditer('\n', source)]
+
+    def _record(self, kind):
+        line, column = self.getpos()
+        self.events.append((self._line_offsets[line - 1] + column, kind))
+
+    def handle_starttag(self, tag, attrs):
+        self._record(INLINE if tag in INLINE_TAGS else BREAK)
+        if tag in RAW_TEXT_TAGS:
+            self._raw_text_tag = tag
+
+    def handle_startendtag(self, tag, attrs):
+        self._record(INLINE if tag in INLINE_TAGS else BREAK)
+
+    def handle_endtag(self, tag):
+        self._record(INLINE if tag in INLINE_TAGS else BREAK)
+        if tag == self._raw_text_tag:
+            self._raw_text_tag = None
+
+    def handle_data(self, data):
+        if self._raw_text_tag is not None:
+            self._record(BREAK)
+        else:
+            self._record(SPACE if data.isspace() else TEXT)
+
+    def handle_entityref(self, name):
+        self._record(TEXT)
+
+    def handle_charref(self, name):
+        self._record(TEXT)
+
+    def handle_comment(self, data):
+        self._record(BREAK)
+
+    def handle_decl(self, decl):
+        self._record(BREAK)
+
+    def handle_pi(self, data):
+        self._record(BREAK)
+
+    def unknown_decl(self, data):
+        self._record(BREAK)
+
+
+def segment_html(source):
+    """
+    Split an HTML page into skeleton pieces and segments.
+
+    Args:
+        source: HTML source
+
+    Returns:
+        Tuple (pieces, segments): pieces is a list of literal strings and
+        segment IDs (as {'id': ...} dictionaries) that concatenate back to
+        the page; segments maps each ID to its source text
+    """
+    recorder = _EventRecorder(source)
+    recorder.feed(source)
+    recorder.close()
+
+    events = recorder.events
+    pieces = []
+    segments = {}
+    position = 0
+    start = end = None
+
+    def close_segment():
+        nonlocal position, start, end
+        if start is None:
+            return
+        text = source[start:end]
+        stripped = text.strip()
+        if stripped and _WORD_RE.search(_MARKUP_RE.sub('', stripped)):
+            start += len(text) - len(text.lstrip())
+            end = start + len(stripped)
+            pieces.append(source[position:start])
+            identifier = segment_id(stripped)
+            segments[identifier] = stripped
+            pieces.append({'id': identifier})
+            position = end
+        start = end = None
+
+    for index, (offset, kind) in enumerate(events):
+        event_end = events[index + 1][0] if index + 1 < len(events) else len(source)
+        if kind == TEXT or kind == INLINE:
+            if start is None:
+                start = offset
+            end = event_end
+        elif kind == BREAK:
+            close_segment()
+        # Whitespace only matters inside a segment, it is trimmed at its edges
+    close_segment()
+    pieces.append(source[position:])
+
+    return [piece for piece in pieces if piece != ''], segments
+
+
+def assemble_html(pieces, translations, segments=None):
+    """
+    Rebuild a page from its skeleton pieces.
+
+    Args:
+        pieces: Skeleton pieces from segment_html()
+        translations: Dictionary of segment ID -> translated text
+        segments: Dictionary of segment ID -> source text, used for missing translations
+
+    Returns:
+        Tuple (html, missing) with the page and the IDs without translation
+    """
+    parts = []
+    missing = []
+    for piece in pieces:
+        if isinstance(piece, str):
+            parts.append(piece)
+            continue
+        identifier = piece['id']
+        text = translations.get(identifier)
+        if not text:
+            missing.append(identifier)
+            text = (segments or {}).get(identifier, '')
+        parts.append(text)
+    return ''.join(parts), missing
@@ -0,0 +1,206 @@
+"""
+Compact binary snapshots of a project's strings, for release-to-release diffs.
+
+A snapshot holds every (module, locale, key, value) of a project. It is
+read through mmap: only the sections a diff needs are touched, and strings
+are only decoded for the keys that changed. Layout (little-endian):
+
+    header      magic, version and the size of every section below
+    meta        UTF-8 JSON: project, default language and the groups, a
+                group being one (module, locale) with the range of its records
+    hashes      16 bytes per record: key hash, value hash (sorted by key
+                hash within each group: this is the key index)
+    refs        16 bytes per record: offset and length of the key and of
+                the value in the string blob
+    strings     UTF-8 blob; each distinct key or value is stored once
+
+Hashes are 64-bit BLAKE2b digests: two different keys (or values) of the
+same group sharing a hash is negligible even for millions of strings.
+"""
+import hashlib
+import json
+import mmap
+import struct
+from pathlib import Path
+
+MAGIC = b'ATSNAP\x00\x00'
+SNAPSHOT_VERSION = 1
+
+HEADER = struct.Struct('<8sIIQQQ')  # magic, version, meta size, record count, strings size, reserved
+HASHES = struct.Struct('<QQ')       # key hash, value hash
+REFS = struct.Struct('<IIII')       # key offset, key length, value offset, value length
+
+
+def string_hash(text):
+    """Return the 64-bit hash of a string."""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def encode_snapshot(project, default_language, groups):
+    """
+    Serialize the strings of a project.
+
+    Args:
+        project: Project name
+        default_language: Default language code
+        groups: Iterable of (module_name, locale, strings_dict) tuples
+
+    Returns:
+        List of byte strings to write one after the other
+    """
+    blob = bytearray()
+    offsets = {}
+
+    def intern(text):
+        # Keys repeat in every locale and many values too: store each once
+        if text not in offsets:
+            data = text.encode('utf-8')
+            offsets[text] = (len(blob), len(data))
+            blob.extend(data)
+        return offsets[text]
+
+    hashes = bytearray()
+    refs = bytearray()
+    group_entries = []
+    record_count = 0
+
+    for module_name, locale, strings_dict in sorted(groups, key=lambda group: group[:2]):
+        records = sorted((string_hash(key), key, value) for key, value in strings_dict.items())
+        group_entries.append([module_name, locale, record_count, len(records)])
+        record_count += len(records)
+
+        for key_hash, key, value in records:
+            hashes += HASHES.pack(key_hash, string_hash(value))
+            refs += REFS.pack(*intern(key), *intern(value))
+
+    meta = json.dumps({
+        'project': project,
+        'default_language': default_language,
+        'groups': group_entries,
+    }, ensure_ascii=False).encode('utf-8')
+
+    header = HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(meta), record_count, len(blob), 0)
+    return [header, meta, bytes(hashes), bytes(refs), bytes(blob)]
+
+
+class Snapshot:
+    """
+    A snapshot file opened through mmap.
+
+    Used as a context manager; the file is unmapped when the block exits.
+    """
+
+    def __init__(self, path):
+        """
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version
+        """
+        self.path = Path(path)
+        with open(path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"Not a strings snapshot: {path}") from None
+
+        try:
+            self._read_header()
+        except BaseException:
+            self._map.close()
+            raise
+
+    def _read_header(self):
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"Not a strings snapshot: {self.path}")
+        magic, version, meta_size, record_count, strings_size, _ = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"Not a strings snapshot: {self.path}")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}: {self.path}")
+
+        self._hashes_offset = HEADER.size + meta_size
+        self._refs_offset = self._hashes_offset + record_count * HASHES.size
+        self._strings_offset = self._refs_offset + record_count * REFS.size
+        if len(self._map) != self._strings_offset + strings_size:
+            raise ValueError(f"Truncated strings snapshot: {self.path}")
+
+        meta = json.loads(self._map[HEADER.size:self._hashes_offset].decode('utf-8'))
+        self.project = meta['project']
+        self.default_language = meta['default_language']
+        self.groups = {(module_name, locale): (first, length)
+                       for module_name, locale, first, length in meta['groups']}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """Unmap the file."""
+        self._map.close()
+
+    def hash_bytes(self, group):
+        """Return the raw key index of a group: equal bytes mean equal strings."""
+        first, length = self.groups[group]
+        start = self._hashes_offset + first * HASHES.size
+        return self._map[start:start + length * HASHES.size]
+
+    def hashes(self, group):
+        """Return the (key hash, value hash) pairs of a group, sorted by key hash."""
+        return list(HASHES.iter_unpack(self.hash_bytes(group)))
+
+    def record(self, group, index):
+        """Return the (key, value) of the index-th record of a group."""
+        first, _ = self.groups[group]
+        key_offset, key_size, value_offset, value_size = REFS.unpack_from(
+            self._map, self._refs_offset + (first + index) * REFS.size)
+        return self._string(key_offset, key_size), self._string(value_offset, value_size)
+
+    def _string(self, offset, size):
+        start = self._strings_offset + offset
+        return self._map[start:start + size].decode('utf-8')
+
+
+def diff_group(old, new, group):
+    """
+    Compare the records of a group in two snapshots by merge-join on the key hash.
+
+    Args:
+        old: Snapshot of the earlier release (the group may be missing from it)
+        new: Snapshot of the later release (the group may be missing from it)
+        group: (module_name, locale) tuple
+
+    Returns:
+        Dictionary with the added and removed (key, value) pairs and the
+        changed (key, old value, new value) tuples, sorted by key
+    """
+    old_hashes = old.hashes(group) if group in old.groups else []
+    new_hashes = new.hashes(group) if group in new.groups else []
+
+    added, removed, changed = [], [], []
+    i = j = 0
+    while i < len(old_hashes) and j < len(new_hashes):
+        old_key, old_value = old_hashes[i]
+        new_key, new_value = new_hashes[j]
+        if old_key == new_key:
+            if old_value != new_value:
+                key, before = old.record(group, i)
+                changed.append((key, before, new.record(group, j)[1]))
+            i += 1
+            j += 1
+        elif old_key < new_key:
+            removed.append(old.record(group, i))
+            i += 1
+        else:
+            added.append(new.record(group, j))
+            j += 1
+
+    removed.extend(old.record(group, index) for index in range(i, len(old_hashes)))
+    added.extend(new.record(group, index) for index in range(j, len(new_hashes)))
+
+    return {
+        'added': sorted(added),
+        'removed': sorted(removed),
+        'changed': sorted(changed),
+    }
@@ -0,0 +1,227 @@
+"""
+All-or-nothing publication of a group of files (e.g. the strings.xml files of a module).
+
+Files are written to hidden temporary files next to their targets (Android
+resource merging ignores dot files) and published together with os.replace
+when the transaction commits. Before the first replace, a journal listing
+every target and a backup of its previous content is written; if the run
+dies midway, recover() puts the previous files back.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+JOURNAL_NAME = '.android-translator.journal'
+
+# Staged files and backups are named after their target with these suffixes,
+# so that recover() can find the ones a killed run left behind
+TEMP_SUFFIX = '.android-translator.tmp'
+BACKUP_SUFFIX = '.android-translator.bak'
+
+# Temporary files are written through a large buffer: a few writes per file
+BUFFER_SIZE = 1024 * 1024
+
+
+def _fsync_directory(directory):
+    """Persist the entries of a directory (renames), where the platform allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _backup(target):
+    """Keep the current content of target in a hidden file next to it and return its path."""
+    fd, backup = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=BACKUP_SUFFIX)
+    os.close(fd)
+    os.unlink(backup)
+    try:
+        # A hard link is instant; the replace below gives target a new inode
+        os.link(target, backup)
+    except OSError:
+        shutil.copy2(target, backup)
+    return backup
+
+
+class FileTransaction:
+    """
+    Stage files and publish them all at once, or not at all.
+
+    Used as a context manager: the files are published when the block exits
+    normally and discarded if it raises.
+    """
+
+    def __init__(self, journal_dir, fsync=False):
+        """
+        Args:
+            journal_dir: Directory holding the rollback journal while committing
+            fsync: Flush staged files and their directories to disk before publishing
+        """
+        self.journal_path = Path(journal_dir) / JOURNAL_NAME
+        self.fsync = fsync
+        self.staged = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+    def write(self, target, data):
+        """Stage the bytes of a file; target is only replaced on commit."""
+        self.write_chunks(target, (data,))
+
+    def write_chunks(self, target, chunks):
+        """Stage a file from an iterable of byte strings, written one after the other."""
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, 'wb', buffering=BUFFER_SIZE) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+        previous = self.staged.pop(target, None)
+        if previous is not None:
+            os.unlink(previous)
+        self.staged[target] = temp
+
+    def discard(self):
+        """Drop the staged files, leaving every target untouched."""
+        for temp in self.staged.values():
+            try:
+                os.unlink(temp)
+            except FileNotFoundError:
+                pass
+        self.staged.clear()
+
+    def commit(self):
+        """
+        Publish the staged files.
+
+        Returns:
+            List of the target paths written, in staging order
+        """
+        if not self.staged:
+            return []
+
+        if self.fsync:
+            # One batch of fsyncs for the whole group, before anything is published
+            for temp in self.staged.values():
+                with open(temp, 'rb') as f:
+                    os.fsync(f.fileno())
+
+        entries = []
+        try:
+            for target, temp in self.staged.items():
+                backup = _backup(target) if target.exists() else None
+                entries.append({'target': str(target), 'temp': temp, 'backup': backup})
+        except BaseException:
+            for entry in entries:
+                if entry['backup']:
+                    os.unlink(entry['backup'])
+            self.discard()
+            raise
+
+        with open(self.journal_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': entries}, f, indent=1)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        try:
+            for entry in entries:
+                os.replace(entry['temp'], entry['target'])
+        except BaseException:
+            recover(self.journal_path)
+            self.staged.clear()
+            raise
+
+        if self.fsync:
+            for directory in {os.path.dirname(entry['target']) for entry in entries}:
+                _fsync_directory(directory)
+
+        # Published: the backups and the journal are no longer needed
+        os.unlink(self.journal_path)
+        for entry in entries:
+            if entry['backup']:
+                os.unlink(entry['backup'])
+
+        written = list(self.staged)
+        self.staged.clear()
+        return written
+
+
+def _sweep(journal_dir):
+    """Delete the staged files and backups left in journal_dir and its sub-directories."""
+    directories = [journal_dir]
+    if journal_dir.is_dir():
+        directories += [entry for entry in journal_dir.iterdir() if entry.is_dir()]
+
+    for directory in directories:
+        for suffix in (TEMP_SUFFIX, BACKUP_SUFFIX):
+            for leftover in directory.glob(f".*{suffix}"):
+                leftover.unlink()
+
+
+def recover(journal_path):
+    """
+    Roll back an interrupted commit from its journal.
+
+    Every target is restored to its content before the commit (targets that
+    did not exist are removed). The staged files and backups left by a run
+    killed before or during its commit are deleted, journal or not: they are
+    found by their suffix in the journal directory and its sub-directories.
+
+    Returns:
+        Number of files restored or removed, or 0 if there is no journal
+    """
+    journal_path = Path(journal_path)
+    if not journal_path.exists():
+        _sweep(journal_path.parent)
+        return 0
+
+    try:
+        with open(journal_path, encoding='utf-8') as f:
+            entries = json.load(f)['entries']
+    except (ValueError, KeyError):
+        # The journal itself was cut short: nothing was published yet
+        entries = []
+
+    restored = 0
+    for entry in entries:
+        target, temp, backup = entry['target'], entry['temp'], entry['backup']
+        if backup is not None and os.path.exists(backup):
+            if os.path.exists(target) and os.path.samefile(backup, target):
+                # Never replaced: the backup is still a hard link to the target
+                # (renaming one link over the other would do nothing)
+                os.unlink(backup)
+            else:
+                os.replace(backup, target)
+                restored += 1
+        elif backup is None and not os.path.exists(temp) and os.path.exists(target):
+            # The new file was published: remove it
+            os.unlink(target)
+            restored += 1
+        if os.path.exists(temp):
+            os.unlink(temp)
+
+    os.unlink(journal_path)
+    _sweep(journal_path.parent)
+    return restored
@@ -1,45 +1,69 @@
-import pandas as pd
 from pathlib import Path
 
+from commands.utils.cache import current_cache
+from commands.utils.reporting import log, progress
+from commands.utils.resources import has_string_folders
 
-def convert_to_excel(csv_file):
+
+def convert_to_excel(csv_file, hidden_columns=()):
+    # pandas is only needed for Excel output, keep it out of plain-text runs
+    import pandas as pd
+    
     excel_file = csv_file.with_suffix('.xlsx')
     try:
-        print(f"Converting {csv_file} to {excel_file}")
+        progress(f"Converting {csv_file} to {excel_file}")
         df = pd.read_csv(csv_file)
 
-        df.to_excel(excel_file, index=False)
+        hidden = [idx for idx, column in enumerate(df.columns) if column in hidden_columns]
+        if not hidden:
+            df.to_excel(excel_file, index=False)
+            return
+        
+        from openpyxl.utils import get_column_letter
+        
+        with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False)
+            sheet = next(iter(writer.sheets.values()))
+            for idx in hidden:
+                sheet.column_dimensions[get_column_letter(idx + 1)].hidden = True
     except Exception as e:
-        print(f"Ignored file")
+        log(f"Ignored file")
 
 
-def discover_android_modules(android_root):
+def iter_android_modules(android_root):
     """
-    Discover all Android modules in a project by finding directories that contain
-    src/main/res/values or res/values folders.
-    
+    Lazily discover Android modules, yielding each one as soon as it is found.
+
+    Same rules as discover_android_modules, but results are streamed in
+    filesystem walk order (duplicates are skipped) so that callers can start
+    working on the first module before the walk has finished.
+
     Args:
         android_root: Path to the Android project root directory
-        
-    Returns:
-        List of tuples (module_name, module_path) where module_path is the path to src/main
-        or the parent of res/ directory
+
+    Yields:
+        Tuples (module_name, module_path)
     """
     android_root = Path(android_root)
-    modules = []
+    
+    # A warm cache already holds the full list, nothing to stream
+    if current_cache() is not None:
+        yield from discover_android_modules(android_root)
+        return
+    
+    yield from _walk_android_modules(android_root)
+
+
+def _walk_android_modules(android_root):
+    seen = set()
     
     # Walk through the directory tree
     for path in android_root.rglob('res'):
         if not path.is_dir():
             continue
             
-        # Check if this res directory contains values folders
-        has_values = any(
-            item.is_dir() and item.name.startswith('values')
-            for item in path.iterdir()
-        )
-        
-        if not has_values:
+        # Check if this res directory contains locale values folders with strings
+        if not has_string_folders(path):
             continue
         
         # Determine the module path (parent of res)
@@ -67,9 +91,31 @@ def discover_android_modules(android_root):
             # Path is not relative to android_root
             module_name = module_main_path.name
         
-        modules.append((module_name, module_main_path))
+        module = (module_name, module_main_path)
+        if module in seen:
+            continue
+        seen.add(module)
+        yield module
+
+
+def discover_android_modules(android_root):
+    """
+    Discover all Android modules in a project by finding directories that contain
+    src/main/res/values* or res/values* locale folders with a strings.xml.
     
+    Args:
+        android_root: Path to the Android project root directory
+        
+    Returns:
+        List of tuples (module_name, module_path) where module_path is the path to src/main
+        or the parent of res/ directory
+    """
+    cache = current_cache()
+    if cache is not None:
+        return cache.modules(Path(android_root), lambda: _discover_android_modules(android_root))
+    return _discover_android_modules(android_root)
+
+
+def _discover_android_modules(android_root):
     # Remove duplicates and sort
-    modules = sorted(set(modules), key=lambda x: x[0])
-    
-    return modules
+    return sorted(_walk_android_modules(Path(android_root)), key=lambda x: x[0])
@@ -0,0 +1,92 @@
+"""
+Local git queries used to limit work to what changed on a branch.
+"""
+import subprocess
+from pathlib import Path
+
+from commands.utils.resources import locale_qualifier
+
+
+def run_git(repo_path, *arguments):
+    """
+    Run a git command in a repository and return its standard output.
+
+    Args:
+        repo_path: Any path inside the repository
+        *arguments: git arguments
+
+    Returns:
+        Standard output of the command
+
+    Raises:
+        ValueError: If git is not installed or the command fails
+    """
+    try:
+        result = subprocess.run(
+            ['git', '-C', str(repo_path), *arguments],
+            capture_output=True, text=True, encoding='utf-8',
+        )
+    except FileNotFoundError:
+        raise ValueError("git is not installed or not on PATH")
+
+    if result.returncode != 0:
+        raise ValueError(f"git {' '.join(arguments)} failed: {result.stderr.strip()}")
+
+    return result.stdout
+
+
+def changed_files(repo_path, ref):
+    """
+    List the files changed since a git ref, including uncommitted changes.
+
+    Committed, staged and unstaged changes come from a diff of the ref against
+    the working tree; untracked files (not ignored) are added on top.
+
+    Args:
+        repo_path: Any path inside the repository
+        ref: Commit, branch or tag to compare with
+
+    Returns:
+        Set of absolute paths (deleted files included)
+    """
+    top_level = Path(run_git(repo_path, 'rev-parse', '--show-toplevel').strip())
+
+    # Fail early with a clear message on an unknown ref
+    try:
+        run_git(repo_path, 'rev-parse', '--verify', '--quiet', f"{ref}^{{commit}}")
+    except ValueError:
+        raise ValueError(f"Unknown git ref: {ref}")
+
+    diff = run_git(repo_path, 'diff', '--name-only', '-z', ref, '--')
+    untracked = run_git(repo_path, 'ls-files', '--others', '--exclude-standard', '-z', '--full-name',
+                        '--', str(top_level))
+
+    return {
+        (top_level / name).resolve()
+        for name in (diff + untracked).split('\0')
+        if name
+    }
+
+
+def changed_string_resources(android_root, ref):
+    """
+    Find the res directories whose strings.xml files changed since a git ref.
+
+    Args:
+        android_root: Path to the Android project root (inside a git repository)
+        ref: Commit, branch or tag to compare with
+
+    Returns:
+        Tuple (res_dirs, files): the set of resolved res directories with a
+        changed locale strings.xml under android_root, and the sorted list
+        of those files
+    """
+    root = Path(android_root).resolve()
+    files = sorted(
+        path for path in changed_files(android_root, ref)
+        if path.is_relative_to(root)
+        and path.name == 'strings.xml'
+        and path.parent.parent.name == 'res'
+        and locale_qualifier(path.parent.name) is not None
+    )
+    return {path.parent.parent for path in files}, files
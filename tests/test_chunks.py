@@ -0,0 +1,103 @@
+"""Tests of the splitting of large pages into parts and of their reassembly on import."""
+import pytest
+
+from commands.html_export import add_part_columns, cell_rows
+from commands.html_import import file_entries, write_html_rows
+from commands.utils.chunks import CHUNK_SIZE, content_checksum, format_part, parse_part, split_content
+
+LARGE_PAGE = ''.join(f'<p class="line">Paragraph {index} — déjà vu \\n</p>\n' for index in range(2000))
+
+
+def test_large_page_is_split_below_the_cell_limit():
+    assert len(LARGE_PAGE) > CHUNK_SIZE
+
+    parts = split_content(LARGE_PAGE)
+
+    assert len(parts) > 1
+    assert all(len(part) <= CHUNK_SIZE for part in parts)
+    assert ''.join(parts) == LARGE_PAGE
+    # Split at line ends, so no tag or escape sequence is cut
+    assert all(part.endswith('\n') for part in parts[:-1])
+
+
+def test_split_without_boundary_keeps_escapes_whole():
+    content = 'x' * (CHUNK_SIZE - 1) + '\\n' + 'y' * 10
+
+    parts = split_content(content)
+
+    assert ''.join(parts) == content
+    assert not parts[0].endswith('\\')
+
+
+def test_small_page_is_one_part():
+    assert split_content('<p>Hi</p>') == ['<p>Hi</p>']
+
+
+@pytest.mark.parametrize('label, expected', [('1/3', (1, 3)), (' 3/3 ', (3, 3))])
+def test_parse_part(label, expected):
+    assert parse_part(label) == expected
+    assert format_part(*expected) == label.strip()
+
+
+@pytest.mark.parametrize('label', ['0/3', '4/3', '3', 'a/b', ''])
+def test_parse_invalid_part(label):
+    with pytest.raises(ValueError):
+        parse_part(label)
+
+
+def page_rows():
+    """Return the table rows (header first) of a large page and a small one, as exported."""
+    rows = [['file', 'content'], *cell_rows('big.html', LARGE_PAGE), *cell_rows('small.html', '<p>Hi</p>')]
+    add_part_columns(rows)
+    return rows
+
+
+def test_parts_are_joined_in_part_order():
+    rows = page_rows()
+    count = len(rows) - 2
+    # Parts in reverse order, the small page first
+    shuffled = [rows[0], rows[-1]] + rows[count:0:-1]
+
+    entries = file_entries(shuffled)
+
+    assert [entry[0] for entry in entries] == ['small.html', 'big.html']
+    assert entries[0] == ('small.html', '<p>Hi</p>', None)
+    file_name, parts, checksum = entries[1]
+    assert ''.join(parts) == LARGE_PAGE
+    assert checksum == content_checksum(LARGE_PAGE)
+
+
+def test_missing_part():
+    rows = page_rows()
+    del rows[2]
+
+    with pytest.raises(ValueError, match=r'big\.html: missing part\(s\) 2 of'):
+        file_entries(rows)
+
+
+def test_duplicated_part():
+    rows = page_rows()
+    rows.insert(2, list(rows[1]))
+
+    with pytest.raises(ValueError, match='part 1 appears twice'):
+        file_entries(rows)
+
+
+def test_unsplit_table():
+    rows = [['file', 'content'], ['a.html', '<p>A</p>'], ['b.html', '<p>B</p>']]
+
+    assert file_entries(rows) == [('a.html', '<p>A</p>', None), ('b.html', '<p>B</p>', None)]
+
+
+def test_write_joined_page(tmp_path):
+    # Cells hold literal "\\n" sequences for line breaks: a page without any
+    page = LARGE_PAGE.replace('\\n', '')
+    rows = [['file', 'content'], *cell_rows('big.html', page), *cell_rows('small.html', '<p>Hi</p>')]
+    add_part_columns(rows)
+    shuffled = [rows[0]] + rows[:0:-1]
+
+    write_html_rows(file_entries(shuffled), tmp_path)
+
+    # Compared through checksums: a diff of pages this large is unreadable
+    assert content_checksum((tmp_path / 'big.html').read_text(encoding='utf-8')) == content_checksum(page)
+    assert (tmp_path / 'small.html').read_text(encoding='utf-8') == '<p>Hi</p>'
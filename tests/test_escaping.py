@@ -0,0 +1,66 @@
+"""Tests of the Android string escaping codec."""
+import random
+
+import pytest
+
+from commands.utils.escaping import (
+    escape_android_string,
+    escape_legacy_cell,
+    unescape_android_string,
+    unescape_control_chars,
+)
+
+# Biased towards the characters the codec handles specially
+ALPHABET = 'ab @?\'"\\\n\t\r %$<>&u0' + 'é中'
+
+
+def test_round_trip_random_strings():
+    rng = random.Random(0)
+    for _ in range(200000):
+        sample = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 12)))
+        escaped = escape_android_string(sample)
+        assert unescape_android_string(escaped) == sample, escaped
+
+
+@pytest.mark.parametrize('text, escaped', [
+    ('@home', '\\@home'),
+    ('?attr/color', '\\?attr/color'),
+    ('mail@example.com', 'mail@example.com'),
+    ("it's", "it\\'s"),
+    ('say "hi"', 'say \\"hi\\"'),
+    ('back\\slash', 'back\\\\slash'),
+    ('line\nnext', 'line\\nnext'),
+    ('tab\there', 'tab\\there'),
+    (' lead', '\\u0020lead'),
+    ('trail ', 'trail\\u0020'),
+    ('a  b', 'a \\u0020b'),
+    ('plain text', 'plain text'),
+])
+def test_escape(text, escaped):
+    assert escape_android_string(text) == escaped
+
+
+@pytest.mark.parametrize('escaped, text', [
+    ('\\u0041BC', 'ABC'),
+    ('\\u00e9t\\u00E9', 'été'),
+    ('\\@home', '@home'),
+    ('\\?attr', '?attr'),
+    ('"a   b"  c', 'a   b c'),
+    ('"  "', '  '),
+    ('a   b', 'a b'),
+    ('  padded  ', 'padded'),
+    ('"it\'s"', "it's"),
+    ('line\\nnext', 'line\nnext'),
+])
+def test_unescape(escaped, text):
+    assert unescape_android_string(escaped) == text
+
+
+def test_escape_legacy_cell_only_escapes_single_quotes():
+    # Cells of old exports are still Android-escaped: nothing else is touched
+    assert escape_legacy_cell("l'ami \\n \\\"x\\\" \\@") == "l\\'ami \\n \\\"x\\\" \\@"
+
+
+def test_unescape_control_chars():
+    assert unescape_control_chars('a\\nb\\tc\\rd') == 'a\nb\tc\rd'
+    assert unescape_control_chars('no escapes') == 'no escapes'
@@ -0,0 +1,122 @@
+"""Tests of the bounded-queue pipeline behind strings export --pipeline."""
+import threading
+import time
+
+import pytest
+
+from commands.utils.pipeline import run_pipeline
+from commands.utils.reporting import buffered, progress, run
+
+
+def run_with_timeout(*args, timeout=10, **kwargs):
+    """Run a pipeline on a thread; fail instead of hanging if it never returns."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['results'] = run_pipeline(*args, **kwargs)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline did not shut down"
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['results']
+
+
+def test_results_go_through_every_stage():
+    results = run_with_timeout(range(20), [(lambda x: x + 1, 3), (lambda x: x * 2, 2)])
+
+    assert sorted(results) == [(x + 1) * 2 for x in range(20)]
+
+
+def test_none_drops_an_item():
+    results = run_with_timeout(range(10), [(lambda x: x if x % 2 else None, 2)])
+
+    assert sorted(results) == [1, 3, 5, 7, 9]
+
+
+def test_worker_error_is_raised_after_draining():
+    processed = []
+
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError("bad item 3")
+        return x
+
+    def record(x):
+        processed.append(x)
+        return x
+
+    with pytest.raises(ValueError, match='bad item 3'):
+        run_with_timeout(range(50), [(fail_on_three, 2), (record, 1)], queue_size=1)
+
+    # The other items still went through
+    assert sorted(processed) == [x for x in range(50) if x != 3]
+
+
+def test_source_error_is_raised():
+    def source():
+        yield 1
+        raise OSError("walk failed")
+
+    with pytest.raises(OSError, match='walk failed'):
+        run_with_timeout(source(), [(lambda x: x, 2)])
+
+
+def test_shutdown_with_full_queues_behind_a_slow_stage():
+    def slow(x):
+        time.sleep(0.001)
+        return x
+
+    # Every queue holds a single item: upstream stages block until the slow one catches up
+    results = run_with_timeout(range(200), [(lambda x: x, 4), (slow, 1), (lambda x: x, 4)], queue_size=1)
+
+    assert sorted(results) == list(range(200))
+
+
+def test_shutdown_when_the_consumer_fails():
+    consumed = []
+
+    def consume(x):
+        consumed.append(x)
+        if x == 0:
+            raise RuntimeError("consumer failed")
+
+    # The failing consumer keeps draining, or the stages would block on the full queues
+    with pytest.raises(RuntimeError, match='consumer failed'):
+        run_with_timeout(range(100), [(lambda x: x, 2), (lambda x: x, 2)], queue_size=1,
+                         consume=consume)
+
+    assert sorted(consumed) == list(range(100))
+
+
+def test_consume_runs_on_the_caller_thread():
+    threads = set()
+
+    run_pipeline(range(10), [(lambda x: x, 3)], consume=lambda x: threads.add(threading.get_ident()))
+
+    assert threads == {threading.get_ident()}
+
+
+def test_buffered_output_is_written_by_the_consumer(capsys):
+    def stage(item):
+        lines, x = item
+        with buffered(lines):
+            progress(f"item {x} start")
+            time.sleep(0.001 * (x % 3))
+            progress(f"item {x} end")
+        return lines, x
+
+    with run('test'):
+        run_pipeline((([], x) for x in range(10)), [(stage, 4)],
+                     consume=lambda item: print('\n'.join(item[0])))
+
+    output = capsys.readouterr().out.splitlines()
+    # Each item's lines stay together
+    for start in range(0, len(output), 2):
+        assert output[start].endswith('start')
+        assert output[start + 1] == output[start].replace('start', 'end')
@@ -0,0 +1,85 @@
+"""Tests of the segmentation of HTML pages and of their reassembly."""
+import pytest
+
+from commands.utils.segments import assemble_html, segment_html, segment_id
+
+PAGE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Help &amp; support</title>
+  <style>p { color: red; }</style>
+</head>
+<body class="help">
+  <!-- Generated; do not edit -->
+  <h1 id="top">Getting started</h1>
+  <p>Tap <b>Save</b> to keep your changes &mdash; or <a href="cancel.html" title="Cancel">cancel</a>.</p>
+  <p>Caf&#233; &amp; cr&egrave;me, déjà vu<br/>second line</p>
+  <script>var title = "<p>not a segment</p>";</script>
+  <p>   </p>
+  <p>Getting started</p>
+  <p>&nbsp;&#160;</p>
+</body>
+</html>
+'''
+
+
+def segment_texts(pieces, segments):
+    return [segments[piece['id']] for piece in pieces if isinstance(piece, dict)]
+
+
+def test_round_trip():
+    pieces, segments = segment_html(PAGE)
+
+    page, missing = assemble_html(pieces, {}, segments)
+
+    assert page == PAGE
+    assert sorted(missing) == sorted(piece['id'] for piece in pieces if isinstance(piece, dict))
+
+
+def test_segments():
+    pieces, segments = segment_html(PAGE)
+
+    assert segment_texts(pieces, segments) == [
+        'Help &amp; support',
+        'Getting started',
+        'Tap <b>Save</b> to keep your changes &mdash; or '
+        '<a href="cancel.html" title="Cancel">cancel</a>.',
+        'Caf&#233; &amp; cr&egrave;me, déjà vu<br/>second line',
+        'Getting started',
+    ]
+    # Identical paragraphs share one segment
+    assert len(segments) == 4
+    assert segment_id('Getting started') in segments
+
+
+@pytest.mark.parametrize('source', [
+    '',
+    'plain text, no markup',
+    '<p>unclosed <b>bold',
+    '<div>\r\n  <p>Windows\r\nline ends</p>\r\n</div>',
+    '<![CDATA[raw]]><?xml-stylesheet href="a.css"?><p>after</p>',
+])
+def test_round_trip_edge_cases(source):
+    pieces, segments = segment_html(source)
+
+    assert assemble_html(pieces, {}, segments)[0] == source
+
+
+def test_apply_translation():
+    pieces, segments = segment_html(PAGE)
+    source = ('Tap <b>Save</b> to keep your changes &mdash; or '
+              '<a href="cancel.html" title="Cancel">cancel</a>.')
+    translation = ('Touchez <b>Enregistrer</b> pour garder vos modifications &mdash; ou '
+                   '<a href="cancel.html" title="Annuler">annulez</a>.')
+
+    page, missing = assemble_html(pieces, {segment_id(source): translation}, segments)
+
+    assert page == PAGE.replace(source, translation)
+    assert set(missing) == set(segments) - {segment_id(source)}
+
+
+def test_missing_translation_without_sources():
+    pieces, _ = segment_html('<p>Hello</p>')
+
+    assert assemble_html(pieces, {}) == ('<p></p>', [segment_id('Hello')])
@@ -0,0 +1,96 @@
+"""Tests of the binary strings snapshots and of the diff between two of them."""
+import pytest
+
+from commands.strings_diff import diff_snapshots
+from commands.utils.snapshot import Snapshot, diff_group, encode_snapshot
+
+OLD = [
+    ('app', 'en', {'title': 'Café', 'greeting': 'Hello', 'bye': 'Bye', 'planets,0': 'Mercury'}),
+    ('app', 'fr', {'title': 'Café', 'greeting': 'Bonjour'}),
+    ('lib/core', 'en', {}),
+    ('lib/legacy', 'en', {'old': 'Old'}),
+]
+
+NEW = [
+    ('app', 'en', {'title': 'Café', 'greeting': 'Hi', 'planets,0': 'Mercury', 'welcome': 'Welcome'}),
+    ('app', 'fr', {'title': 'Café', 'greeting': 'Bonjour'}),
+    ('lib/core', 'en', {'retry': 'Retry'}),
+    ('lib/empty', 'en', {}),
+]
+
+
+def write_snapshot(path, groups, project='MyApp'):
+    path.write_bytes(b''.join(encode_snapshot(project, 'en', groups)))
+    return path
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    with Snapshot(write_snapshot(tmp_path / 'v1.snapshot', OLD)) as old, \
+            Snapshot(write_snapshot(tmp_path / 'v2.snapshot', NEW)) as new:
+        yield old, new
+
+
+def test_round_trip(tmp_path):
+    with Snapshot(write_snapshot(tmp_path / 'v1.snapshot', OLD)) as snapshot:
+        assert snapshot.project == 'MyApp'
+        assert snapshot.default_language == 'en'
+        assert set(snapshot.groups) == {group[:2] for group in OLD}
+
+        for module_name, locale, strings_dict in OLD:
+            group = (module_name, locale)
+            records = [snapshot.record(group, index) for index in range(len(snapshot.hashes(group)))]
+            assert dict(records) == strings_dict
+
+
+def test_empty_module(tmp_path):
+    with Snapshot(write_snapshot(tmp_path / 'empty.snapshot', [('app', 'en', {})])) as snapshot:
+        assert snapshot.groups == {('app', 'en'): (0, 0)}
+        assert snapshot.hash_bytes(('app', 'en')) == b''
+
+
+def test_diff_group(snapshots):
+    old, new = snapshots
+
+    assert diff_group(old, new, ('app', 'en')) == {
+        'added': [('welcome', 'Welcome')],
+        'removed': [('bye', 'Bye')],
+        'changed': [('greeting', 'Hello', 'Hi')],
+    }
+
+
+def test_diff_group_missing_or_empty_on_one_side(snapshots):
+    old, new = snapshots
+
+    assert diff_group(old, new, ('lib/core', 'en')) == {
+        'added': [('retry', 'Retry')], 'removed': [], 'changed': []}
+    assert diff_group(old, new, ('lib/legacy', 'en')) == {
+        'added': [], 'removed': [('old', 'Old')], 'changed': []}
+    assert diff_group(old, new, ('lib/empty', 'en')) == {
+        'added': [], 'removed': [], 'changed': []}
+
+
+def test_diff_snapshots_lists_changed_groups_only(snapshots):
+    old, new = snapshots
+
+    changes = {(change['module'], change['locale']): change for change in diff_snapshots(old, new)}
+
+    # Unchanged and empty groups are left out
+    assert sorted(changes) == [('app', 'en'), ('lib/core', 'en'), ('lib/legacy', 'en')]
+    assert changes['lib/legacy', 'en']['removed'] == [('old', 'Old')]
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / 'strings.xml'
+    path.write_bytes(b'<resources/>' * 10)
+
+    with pytest.raises(ValueError, match='Not a strings snapshot'):
+        Snapshot(path)
+
+
+def test_truncated_snapshot(tmp_path):
+    path = write_snapshot(tmp_path / 'v1.snapshot', OLD)
+    path.write_bytes(path.read_bytes()[:-1])
+
+    with pytest.raises(ValueError, match='Truncated'):
+        Snapshot(path)
@@ -0,0 +1,89 @@
+"""Tests of the in-place update of strings.xml files by fingerprinted imports."""
+import pytest
+
+from commands.strings_import import element_spans, splice_changed_elements
+
+STRINGS_XML = '''<?xml version="1.0" encoding="utf-8"?>
+<!-- Écran d'accueil — « bienvenue » -->
+<resources>
+    <string name="title">Café crème</string>
+    <!-- a comment with <string name="fake">x</string> -->
+    <string name="html"><![CDATA[<b>Bold</b> & more]]></string>
+    <string name="app_id" translatable="false">com.example</string>
+    <string name="greeting">Hello</string>
+    <string-array name="planets">
+        <item>Mercury</item>
+        <item>Vénus</item>
+    </string-array>
+    <string name="farewell">Bye</string>
+</resources>
+'''.encode('utf-8')
+
+
+@pytest.fixture
+def strings_xml(tmp_path):
+    path = tmp_path / 'strings.xml'
+    path.write_bytes(STRINGS_XML)
+    return path
+
+
+def test_element_spans_are_byte_offsets():
+    spans = element_spans(STRINGS_XML)
+
+    # Comments, their look-alike elements and non-translatable strings are not spliceable
+    assert list(spans) == ['title', 'html', 'greeting', 'planets', 'farewell']
+    assert STRINGS_XML[slice(*spans['title'])] == '<string name="title">Café crème</string>'.encode('utf-8')
+    assert STRINGS_XML[slice(*spans['html'])] == b'<string name="html"><![CDATA[<b>Bold</b> & more]]></string>'
+    assert STRINGS_XML[slice(*spans['planets'])].startswith(b'<string-array name="planets">')
+    assert STRINGS_XML[slice(*spans['planets'])].endswith(b'</string-array>')
+
+
+def test_element_spans_of_self_closing_element():
+    content = b'<resources><string name="empty"/><string name="a">A</string></resources>'
+    spans = element_spans(content)
+
+    assert content[slice(*spans['empty'])] == b'<string name="empty"/>'
+    assert content[slice(*spans['a'])] == b'<string name="a">A</string>'
+
+
+@pytest.mark.parametrize('lang_values, changed_keys, before, after', [
+    # Changed string, after non-ASCII content
+    ({'greeting': 'Grüß dich'}, ['greeting'],
+     '    <string name="greeting">Hello</string>\n',
+     '    <string name="greeting">Grüß dich</string>\n'),
+    # Removed key: its whole line goes
+    ({}, ['farewell'],
+     '    <string name="farewell">Bye</string>\n',
+     ''),
+    # Appended key, before the closing tag
+    ({'welcome': 'Bienvenue'}, ['welcome'],
+     '</resources>\n',
+     '    <string name="welcome">Bienvenue</string>\n</resources>\n'),
+    # Changed array item: the array is rebuilt with its other items
+    ({'planets,1': 'Venus'}, ['planets,1'],
+     '        <item>Vénus</item>\n',
+     '        <item>Venus</item>\n'),
+])
+def test_splice_changes_only_the_changed_element(strings_xml, lang_values, changed_keys, before, after):
+    expected = STRINGS_XML.replace(before.encode('utf-8'), after.encode('utf-8'))
+    assert expected != STRINGS_XML
+
+    assert splice_changed_elements(strings_xml, lang_values, changed_keys) == expected
+
+
+def test_splice_several_changes_keeps_untouched_bytes(strings_xml):
+    spliced = splice_changed_elements(strings_xml,
+                                      {'title': 'Tea', 'welcome': 'Hi'},
+                                      ['title', 'farewell', 'welcome'])
+
+    expected = (STRINGS_XML
+                .replace('Café crème'.encode('utf-8'), b'Tea')
+                .replace(b'    <string name="farewell">Bye</string>\n', b'')
+                .replace(b'</resources>', b'    <string name="welcome">Hi</string>\n</resources>'))
+    assert spliced == expected
+
+
+def test_splice_unreadable_file(strings_xml):
+    strings_xml.write_bytes(b'<resources><string name="a">A</resources>')
+
+    assert splice_changed_elements(strings_xml, {'a': 'B'}, ['a']) is None
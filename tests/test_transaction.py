@@ -0,0 +1,152 @@
+"""Tests of the all-or-nothing file publication and its crash recovery."""
+import os
+
+import pytest
+
+from commands.utils import transaction
+from commands.utils.transaction import JOURNAL_NAME, FileTransaction, recover
+
+
+class Killed(BaseException):
+    """Stands for the process being killed at the point it is raised."""
+
+
+@pytest.fixture
+def res(tmp_path):
+    """A res directory with two existing strings files and room for a new one."""
+    for folder in ('values', 'values-fr'):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / 'strings.xml').write_text(f'old {folder}')
+    return tmp_path
+
+
+@pytest.fixture
+def killed(monkeypatch):
+    """Keep commit() from rolling back by itself, as a killed process would."""
+    monkeypatch.setattr(transaction, 'recover', lambda journal_path: 0)
+
+
+def stage(res):
+    """Stage new content for both existing files and a new one; return the transaction."""
+    files = FileTransaction(res)
+    for folder in ('values', 'values-fr', 'values-de'):
+        files.write(res / folder / 'strings.xml', f'new {folder}'.encode())
+    return files
+
+
+def leftovers(res):
+    """Return the hidden files (temps, backups, journal) under res."""
+    return sorted(path.name for path in res.rglob('.*'))
+
+
+def fail_on_call(monkeypatch, name, call):
+    """Make the call-th call of transaction.os.<name> raise Killed."""
+    original = getattr(os, name)
+    calls = []
+
+    def failing(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == call:
+            raise Killed()
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(transaction.os, name, failing)
+
+
+def assert_rolled_back(res):
+    assert (res / 'values' / 'strings.xml').read_text() == 'old values'
+    assert (res / 'values-fr' / 'strings.xml').read_text() == 'old values-fr'
+    assert not (res / 'values-de' / 'strings.xml').exists()
+    assert leftovers(res) == []
+
+
+def test_commit_publishes_every_file(res):
+    with stage(res):
+        pass
+
+    for folder in ('values', 'values-fr', 'values-de'):
+        assert (res / folder / 'strings.xml').read_text() == f'new {folder}'
+    assert leftovers(res) == []
+
+
+def test_discard_leaves_targets_untouched(res):
+    with pytest.raises(RuntimeError):
+        with stage(res):
+            raise RuntimeError()
+
+    assert_rolled_back(res)
+
+
+def test_failed_replace_rolls_back(res, monkeypatch):
+    fail_on_call(monkeypatch, 'replace', 2)
+
+    with pytest.raises(Killed):
+        stage(res).commit()
+
+    monkeypatch.undo()
+    assert_rolled_back(res)
+
+
+def test_recover_sweeps_staged_files_of_a_run_killed_before_commit(res):
+    stage(res)
+    assert len(leftovers(res)) == 3
+
+    assert recover(res / JOURNAL_NAME) == 0
+    assert_rolled_back(res)
+
+
+def test_recover_after_crash_before_replace(res, killed, monkeypatch):
+    fail_on_call(monkeypatch, 'replace', 1)
+
+    with pytest.raises(Killed):
+        stage(res).commit()
+
+    monkeypatch.undo()
+    assert JOURNAL_NAME in leftovers(res)
+    assert recover(res / JOURNAL_NAME) == 0
+    assert_rolled_back(res)
+
+
+def test_recover_after_crash_mid_replace(res, killed, monkeypatch):
+    fail_on_call(monkeypatch, 'replace', 2)
+
+    with pytest.raises(Killed):
+        stage(res).commit()
+
+    monkeypatch.undo()
+    target = res / 'values' / 'strings.xml'
+    backups = list((res / 'values').glob('.*.bak'))
+    assert len(backups) == 1
+    # Replaced: the target is a new inode, the backup holds the old one
+    assert target.read_text() == 'new values'
+    assert not os.path.samefile(backups[0], target)
+
+    assert recover(res / JOURNAL_NAME) == 1
+    assert_rolled_back(res)
+
+
+def test_recover_after_crash_after_replace(res, killed, monkeypatch):
+    def kill(directory):
+        raise Killed()
+
+    # Directories are synced after the last replace, before the journal is removed
+    monkeypatch.setattr(transaction, '_fsync_directory', kill)
+
+    files = stage(res)
+    files.fsync = True
+    with pytest.raises(Killed):
+        files.commit()
+
+    monkeypatch.undo()
+    for folder in ('values', 'values-fr', 'values-de'):
+        assert (res / folder / 'strings.xml').read_text() == f'new {folder}'
+
+    assert recover(res / JOURNAL_NAME) == 3
+    assert_rolled_back(res)
+
+
+def test_recover_without_journal_keeps_other_files(res):
+    (res / 'values' / '.keep').write_text('')
+
+    assert recover(res / JOURNAL_NAME) == 0
+    assert leftovers(res) == ['.keep']